@@ -17,7 +17,7 @@ class MenuAPI(http.Controller):
             'data': data or []
         }
         return Response(
-            json.dumps(response_data, default=str),
+            json.dumps(response_data, default=str, separators=(',', ':')).encode(),
             content_type='application/json',
             status=status
         )
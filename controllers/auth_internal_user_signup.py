@@ -12,9 +12,29 @@ _logger = logging.getLogger(__name__)
 
 # Regex patterns (compile once at module level)
 EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
-PASSWORD_REGEX = re.compile(
-    r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$'
-)
+PASSWORD_SPECIALS = frozenset('@$!%*?&')
+
+
+def is_strong_password(password):
+    """
+    At least 8 characters from [A-Za-z0-9@$!%*?&], with at least one of each
+    class. Single pass over the string, collecting seen classes in a bitmask.
+    """
+    if len(password) < 8:
+        return False
+    flags = 0
+    for ch in password:
+        if 'a' <= ch <= 'z':
+            flags |= 1
+        elif 'A' <= ch <= 'Z':
+            flags |= 2
+        elif '0' <= ch <= '9':
+            flags |= 4
+        elif ch in PASSWORD_SPECIALS:
+            flags |= 8
+        else:
+            return False
+    return flags == 15
 
 
 def decode_and_validate_token(token):
@@ -140,7 +160,7 @@ class AdminAuthController(http.Controller):
                 status=400
             )
 
-        if not PASSWORD_REGEX.match(password):
+        if not is_strong_password(password):
             return self._json_response(
                 {
                     "success": False,
@@ -211,7 +231,7 @@ class AdminAuthController(http.Controller):
     # ───────────────────────────────────────────────────────────────
     def _json_response(self, data, status=200):
         return Response(
-            json.dumps(data, ensure_ascii=False),
+            json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode(),
             status=status,
             headers={
                 "Content-Type": "application/json",
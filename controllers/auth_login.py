@@ -29,7 +29,7 @@ class LoginAuthenticationAPI(http.Controller):
             try:
                 data = request.httprequest.get_json() or {}
             except ValueError:
-                _logger.warning(f"[{request_time}] Invalid JSON payload from {client_ip}")
+                _logger.warning("[%s] Invalid JSON payload from %s", request_time, client_ip)
                 return self._json_response(
                     {'status': 'error', 'message': 'Invalid JSON payload'},
                     status=400
@@ -39,7 +39,7 @@ class LoginAuthenticationAPI(http.Controller):
             password = str(data.get('password', '')).strip()
 
             if not login or not password:
-                _logger.warning(f"[{request_time}] Empty credentials from {client_ip}")
+                _logger.warning("[%s] Empty credentials from %s", request_time, client_ip)
                 return self._json_response(
                     {'status': 'error', 'message': 'Login and password are required'},
                     status=400
@@ -61,17 +61,16 @@ class LoginAuthenticationAPI(http.Controller):
             partner = user.partner_id
 
             # Load JWT secret
-            secret_key = request.env['ir.config_parameter'].sudo().get_param('auth_token.secret_key')
+            ICP = request.env['ir.config_parameter'].sudo()
+            secret_key = ICP.get_param('auth_token.secret_key')
             if not secret_key:
-                _logger.error(f"[{request_time}] Missing 'auth_token.secret_key' in ir.config_parameter")
+                _logger.error("[%s] Missing 'auth_token.secret_key' in ir.config_parameter", request_time)
                 return self._json_response(
                     {'status': 'error', 'message': 'Server configuration error'},
                     status=500
                 )
 
-            expires_in = int(request.env['ir.config_parameter'].sudo().get_param(
-                'auth_token.expires_in', '3600'
-            ))
+            expires_in = int(ICP.get_param('auth_token.expires_in', '3600'))
 
             payload = {
                 'sub': str(user.id),
@@ -83,7 +82,7 @@ class LoginAuthenticationAPI(http.Controller):
 
             access_token = jwt.encode(payload, secret_key, algorithm='HS256')
 
-            _logger.info(f"[{request_time}] Login success → {login} (UID: {uid}) from {client_ip} in DB: {db}")
+            _logger.info("[%s] Login success → %s (UID: %s) from %s in DB: %s", request_time, login, uid, client_ip, db)
 
             response_data = {
                 'status': 'success',
@@ -99,14 +98,14 @@ class LoginAuthenticationAPI(http.Controller):
             return self._json_response(response_data, status=200)
 
         except AccessDenied:
-            _logger.warning(f"[{request_time}] Auth failed for '{login or 'unknown'}' from {client_ip}")
+            _logger.warning("[%s] Auth failed for '%s' from %s", request_time, login or 'unknown', client_ip)
             return self._json_response(
                 {'status': 'error', 'message': 'Invalid credentials'},
                 status=401
             )
 
         except jwt.PyJWTError as jwt_err:
-            _logger.error(f"[{request_time}] JWT error from {client_ip}: {str(jwt_err)}")
+            _logger.error("[%s] JWT error from %s: %s", request_time, client_ip, jwt_err)
             return self._json_response(
                 {'status': 'error', 'message': 'Internal server error'},
                 status=500
@@ -124,7 +123,7 @@ class LoginAuthenticationAPI(http.Controller):
 
     def _json_response(self, data, status=200):
         """Helper for consistent JSON responses"""
-        body = json.dumps(data, ensure_ascii=False)
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
         headers = [
             ('Content-Type', 'application/json; charset=utf-8'),
             ('Cache-Control', 'no-store'),
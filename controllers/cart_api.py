@@ -212,7 +212,7 @@ class CartAPI(http.Controller):
             )
 
             return request.make_response(
-                json.dumps(payload, default=str),
+                json.dumps(payload, default=str, separators=(',', ':')).encode(),
                 headers=[('Content-Type', 'application/json')],
                 status=200
             )
@@ -413,7 +413,7 @@ class CartAPI(http.Controller):
                             cart_id=cart_id, invoice_id=invoice.id)
 
             return request.make_response(
-                json.dumps(payload, default=str),
+                json.dumps(payload, default=str, separators=(',', ':')).encode(),
                 headers=[('Content-Type', 'application/json')],
                 status=200
             )
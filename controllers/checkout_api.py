@@ -155,7 +155,7 @@ class OneStepCheckout(http.Controller):
             }
 
             return request.make_response(
-                json.dumps(response_data, default=str),
+                json.dumps(response_data, default=str, separators=(',', ':')).encode(),
                 headers=[('Content-Type', 'application/json')]
             )
 
@@ -5,6 +5,12 @@ from odoo.http import request, Response
 from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT
 from datetime import datetime, timedelta
 
+from .worker_cache import TTLCache
+
+# Per-worker cache of serialized dashboard bodies, keyed on (dbname, uid)
+_DASH_TTL = 30
+_DASH_CACHE = TTLCache(ttl=_DASH_TTL, size=1024)
+
 
 class WebsiteCustomerDashboardAPI(http.Controller):
 
@@ -12,74 +18,18 @@ class WebsiteCustomerDashboardAPI(http.Controller):
     def get_dashboard(self, **kwargs):
         try:
             user = request.env.user
-            partner = user.partner_id
-            Sale = request.env['sale.order'].sudo()
-            Invoice = request.env['account.move'].sudo()
-
-            # 1. Order & Revenue Stats (Using read_group for speed)
-            order_stats = Sale.read_group(
-                [('partner_id', '=', partner.id), ('state', 'in', ['sale', 'done'])],
-                ['amount_total'], ['partner_id']
-            )
-            total_revenue = order_stats[0]['amount_total'] if order_stats else 0.0
-            total_orders = order_stats[0]['partner_id_count'] if order_stats else 0
-
-            # 2. Cart Stats
-            cart_domain = [('partner_id', '=', partner.id), ('state', '=', 'draft'), ('website_id', '!=', False)]
-            total_carts = Sale.search_count(cart_domain)
-
-            abandon_cutoff = datetime.now() - timedelta(hours=24)
-            abandoned_count = Sale.search_count(cart_domain + [('create_date', '<=', abandon_cutoff)])
-
-            # 3. New Buyer Metrics: Financial & Product Variety
-            # Total Unpaid Amount
-            unpaid_invoices = Invoice.search([
-                ('partner_id', '=', partner.id),
-                ('state', '=', 'posted'),
-                ('payment_state', 'in', ['not_paid', 'partial']),
-                ('move_type', '=', 'out_invoice')
-            ])
-            total_due = sum(unpaid_invoices.mapped('amount_residual'))
-
-            # Unique Products Count (Breadth of purchase)
-            unique_products_count = len(request.env['sale.order.line'].sudo().read_group(
-                [('order_id.partner_id', '=', partner.id), ('order_id.state', 'in', ['sale', 'done'])],
-                ['product_id'], ['product_id']
-            ))
-
-            # 4. Latest 10 Orders
-            latest_recs = Sale.search(
-                [('partner_id', '=', partner.id), ('state', 'in', ['sale', 'done'])],
-                limit=10, order='date_order desc'
-            )
-            latest_orders = [{
-                "id": o.id,
-                "name": o.name,
-                "amount_total": o.amount_total,
-                "state": o.state,
-                "date": o.date_order.strftime(DEFAULT_SERVER_DATETIME_FORMAT) if o.date_order else False,
-            } for o in latest_recs]
-
-            # 5. Build Final Response
-            payload = {
-                "status": "success",
-                "data": {
-                    "user": user.name,
-                    "metrics": {
-                        "total_carts": total_carts,
-                        "total_orders": total_orders,
-                        "abandoned_carts": abandoned_count,
-                        "total_revenue": total_revenue,
-                        "total_due_amount": total_due,
-                        "unique_products_purchased": unique_products_count,
-                    },
-                    "latest_orders": latest_orders
-                }
-            }
+            key = (request.env.cr.dbname, user.id)
+
+            body = _DASH_CACHE.get(key)
+            if body is None:
+                body = _DASH_CACHE.set(
+                    key, json.dumps(self._build_dashboard_payload(user), separators=(',', ':')).encode()
+                )
 
             return Response(
-                json.dumps(payload),
+                body,
                 content_type='application/json;charset=utf-8',
+                headers=[('Cache-Control', 'private, max-age=%d, stale-while-revalidate=60' % _DASH_TTL)],
                 status=200
             )
 
@@ -88,4 +38,72 @@ class WebsiteCustomerDashboardAPI(http.Controller):
                 json.dumps({"status": "error", "message": str(e)}),
                 content_type='application/json;charset=utf-8',
                 status=500
-            )
\ No newline at end of file
+            )
+
+    def _build_dashboard_payload(self, user):
+        partner = user.partner_id
+        Sale = request.env['sale.order'].sudo()
+        Invoice = request.env['account.move'].sudo()
+
+        # 1. Order & Revenue Stats (Using read_group for speed)
+        order_stats = Sale.read_group(
+            [('partner_id', '=', partner.id), ('state', 'in', ['sale', 'done'])],
+            ['amount_total:sum'], [], lazy=False
+        )
+        total_revenue = (order_stats[0]['amount_total'] or 0.0) if order_stats else 0.0
+        total_orders = order_stats[0]['__count'] if order_stats else 0
+
+        # 2. Cart Stats
+        cart_domain = [('partner_id', '=', partner.id), ('state', '=', 'draft'), ('website_id', '!=', False)]
+        total_carts = Sale.search_count(cart_domain)
+
+        abandon_cutoff = datetime.now() - timedelta(hours=24)
+        abandoned_count = Sale.search_count(cart_domain + [('create_date', '<=', abandon_cutoff)])
+
+        # 3. New Buyer Metrics: Financial & Product Variety
+        # Total Unpaid Amount (summed in SQL, no invoice rows loaded)
+        due_stats = Invoice.read_group([
+            ('partner_id', '=', partner.id),
+            ('state', '=', 'posted'),
+            ('payment_state', 'in', ['not_paid', 'partial']),
+            ('move_type', '=', 'out_invoice')
+        ], ['amount_residual:sum'], [])
+        total_due = (due_stats[0]['amount_residual'] or 0.0) if due_stats else 0.0
+
+        # Unique Products Count (Breadth of purchase)
+        product_stats = request.env['sale.order.line'].sudo().read_group(
+            [('order_id.partner_id', '=', partner.id), ('order_id.state', 'in', ['sale', 'done'])],
+            ['product_id:count_distinct'], []
+        )
+        unique_products_count = product_stats[0]['product_id'] if product_stats else 0
+
+        # 4. Latest 10 Orders
+        latest_rows = Sale.search_read(
+            [('partner_id', '=', partner.id), ('state', 'in', ['sale', 'done'])],
+            ['name', 'amount_total', 'state', 'date_order'],
+            limit=10, order='date_order desc'
+        )
+        latest_orders = [{
+            "id": o['id'],
+            "name": o['name'],
+            "amount_total": o['amount_total'],
+            "state": o['state'],
+            "date": o['date_order'].strftime(DEFAULT_SERVER_DATETIME_FORMAT) if o['date_order'] else False,
+        } for o in latest_rows]
+
+        # 5. Build Final Response
+        return {
+            "status": "success",
+            "data": {
+                "user": user.name,
+                "metrics": {
+                    "total_carts": total_carts,
+                    "total_orders": total_orders,
+                    "abandoned_carts": abandoned_count,
+                    "total_revenue": total_revenue,
+                    "total_due_amount": total_due,
+                    "unique_products_purchased": unique_products_count,
+                },
+                "latest_orders": latest_orders
+            }
+        }
@@ -1,15 +1,92 @@
 import json
 import base64
+import binascii
+import hashlib
 import logging
 import datetime
+import time
 import jwt
 
 from odoo import http
 from odoo.http import request, Response
 from odoo.exceptions import AccessDenied, ValidationError
+from odoo.tools.mimetypes import guess_mimetype
+
+from .worker_cache import TTLCache
 
 _logger = logging.getLogger(__name__)
 
+JWT_DECODE_OPTIONS = {"require": ["exp", "iat"]}
+
+JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, PATCH, OPTIONS',
+    'Access-Control-Allow-Headers': 'Authorization, Content-Type',
+}
+
+MAX_IMAGE_BYTES = 4 * 1024 * 1024  # 4MB limit
+# Longest base64 string that can decode to MAX_IMAGE_BYTES
+MAX_IMAGE_B64_LEN = 4 * ((MAX_IMAGE_BYTES + 2) // 3)
+IMAGE_SIGNATURES = (b'\x89PNG', b'\xff\xd8\xff', b'GIF8')
+
+# Fields accepted by update_profile
+PROFILE_USER_FIELDS = frozenset({'name', 'email', 'phone', 'mobile', 'image_1920'})
+PROFILE_PARTNER_FIELDS = frozenset({'street', 'street2', 'city', 'zip', 'country_id', 'state_id'})
+PROFILE_ID_FIELDS = frozenset({'country_id', 'state_id'})
+
+
+def _get_param(key, default=None):
+    """Read a system parameter (served from get_param's ormcache)."""
+    return request.env['ir.config_parameter'].sudo().get_param(key, default)
+
+
+def _get_jwt_secret():
+    """Return the JWT signing secret.
+
+    ``get_param`` is ormcached per key and invalidated by Odoo whenever an
+    ``ir.config_parameter`` is written, so this does not hit the database on
+    the hot authentication path.
+    """
+    return _get_param('auth_token.secret_key')
+
+
+# Per-worker cache of token subjects' is-active flag, keyed on (dbname, uid)
+_USER_ACTIVE_CACHE = TTLCache(ttl=60, size=4096)
+
+
+def _user_active(uid):
+    """Return whether ``uid`` is an existing, active user, cached for 60 seconds."""
+    key = (request.env.cr.dbname, uid)
+    active = _USER_ACTIVE_CACHE.get(key)
+    if active is None:
+        active = _USER_ACTIVE_CACHE.set(
+            key, bool(request.env['res.users'].sudo().search_count([('id', '=', uid)], limit=1))
+        )
+    return active
+
+
+# Per-worker limit on password checks: {(dbname, ip): (window_ends_at, attempts)}
+_PASSWORD_ATTEMPTS = {}
+_PASSWORD_ATTEMPTS_MAX = 5
+_PASSWORD_ATTEMPTS_WINDOW = 60
+
+
+def _password_attempt_allowed(client_ip):
+    """Count a password check for ``client_ip``; False once the window's budget is spent."""
+    key = (request.env.cr.dbname, client_ip)
+    now = time.monotonic()
+    window_end, attempts = _PASSWORD_ATTEMPTS.get(key, (0, 0))
+    if now >= window_end:
+        if len(_PASSWORD_ATTEMPTS) > 10000:
+            for k in [k for k, v in _PASSWORD_ATTEMPTS.items() if now >= v[0]]:
+                del _PASSWORD_ATTEMPTS[k]
+        window_end, attempts = now + _PASSWORD_ATTEMPTS_WINDOW, 0
+    if attempts >= _PASSWORD_ATTEMPTS_MAX:
+        return False
+    _PASSWORD_ATTEMPTS[key] = (window_end, attempts + 1)
+    return True
+
 
 class ProfileAPI(http.Controller):
 
@@ -17,16 +94,10 @@ class ProfileAPI(http.Controller):
     # Helper: JSON response with CORS headers
     # -------------------------------------------------------------
     def _json_response(self, data, status=200):
-        headers = {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, PUT, PATCH, OPTIONS',
-            'Access-Control-Allow-Headers': 'Authorization, Content-Type',
-        }
         return Response(
-            json.dumps(data, ensure_ascii=False),
+            json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode(),
             status=status,
-            headers=headers
+            headers=JSON_HEADERS
         )
 
     # -------------------------------------------------------------
@@ -38,9 +109,7 @@ class ProfileAPI(http.Controller):
             raise AccessDenied("Bearer token missing or invalid format")
 
         token = auth_header.split(' ')[1]
-        secret_key = request.env['ir.config_parameter'].sudo().get_param(
-            'auth_token.secret_key'
-        )
+        secret_key = _get_jwt_secret()
         if not secret_key:
             _logger.error("JWT secret key not configured in ir.config_parameter 'auth_token.secret_key'")
             raise AccessDenied("Server configuration error")
@@ -50,7 +119,7 @@ class ProfileAPI(http.Controller):
                 token,
                 secret_key,
                 algorithms=['HS256'],
-                options={"require": ["exp", "iat"]},
+                options=JWT_DECODE_OPTIONS,
             )
         except jwt.ExpiredSignatureError:
             raise AccessDenied("Token has expired")
@@ -61,34 +130,43 @@ class ProfileAPI(http.Controller):
         if not user_id:
             raise AccessDenied("Token payload missing user_id")
 
-        user = request.env['res.users'].sudo().browse(int(user_id))
-        if not user.exists():
+        user_id = int(user_id)
+        if not _user_active(user_id):
             raise AccessDenied("User not found")
 
-        return user
+        return request.env['res.users'].sudo().browse(user_id)
 
     # -------------------------------------------------------------
     # Build profile payload (image as URL)
     # -------------------------------------------------------------
     def _build_profile(self, user):
-        partner = user.partner_id
+        # Two explicit reads instead of walking user -> partner -> state/country;
+        # bin_size avoids loading the avatar blob just to test for its presence.
+        u = user.with_context(bin_size=True).read(
+            ['name', 'login', 'email', 'phone', 'mobile', 'image_1920', 'partner_id'], load=None
+        )[0]
+        # load=None keeps many2one values as plain ids; state/country names come
+        # from the per-worker ormcache instead of a display_name query
+        p = request.env['res.partner'].sudo().browse(u['partner_id']).read(
+            ['street', 'street2', 'city', 'zip', 'state_id', 'country_id'], load=None
+        )[0]
 
         return {
-            "id": user.id,
-            "name": user.name,
-            "login": user.login,
-            "email": user.email or False,
-            "phone": user.phone or False,
-            "mobile": user.mobile or False,
-            "image_url": f"/web/image/res.users/{user.id}/image_1920" if user.image_1920 else False,
+            "id": u['id'],
+            "name": u['name'],
+            "login": u['login'],
+            "email": u['email'] or False,
+            "phone": u['phone'] or False,
+            "mobile": u['mobile'] or False,
+            "image_url": f"/web/image/res.users/{u['id']}/image_1920" if u['image_1920'] else False,
             "partner": {
-                "partner_id": partner.id,
-                "street": partner.street or False,
-                "street2": partner.street2 or False,
-                "city": partner.city or False,
-                "zip": partner.zip or False,
-                "state": partner.state_id.name if partner.state_id else False,
-                "country": partner.country_id.name if partner.country_id else False,
+                "partner_id": p['id'],
+                "street": p['street'] or False,
+                "street2": p['street2'] or False,
+                "city": p['city'] or False,
+                "zip": p['zip'] or False,
+                "state": request.env['res.country.state']._get_state_name(p['state_id']) if p['state_id'] else False,
+                "country": request.env['res.country']._get_country_name(p['country_id']) if p['country_id'] else False,
             }
         }
 
@@ -128,6 +206,75 @@ class ProfileAPI(http.Controller):
                 "message": str(e)
             }, status=500)
 
+    # -------------------------------------------------------------
+    # GET /api/v1/profile/avatar → Raw avatar bytes (ETag cached)
+    # -------------------------------------------------------------
+    @http.route(
+        '/api/v1/profile/avatar',
+        type='http',
+        auth='none',
+        methods=['GET'],
+        csrf=False,
+        cors="*"
+    )
+    def profile_avatar(self):
+        try:
+            user = self._authenticate_bearer()
+        except AccessDenied as e:
+            return self._json_response({
+                "success": False,
+                "error": "Unauthorized",
+                "message": str(e)
+            }, status=401)
+
+        # The stored attachment's checksum is the tag, so a revalidation is
+        # answered without loading or hashing the image itself
+        checksum = self._image_checksum(user)
+        if not checksum:
+            return self._json_response({
+                "success": False,
+                "error": "No avatar set"
+            }, status=404)
+
+        headers = [
+            ('Cache-Control', 'private, max-age=300'),
+            ('ETag', '"%s"' % checksum),
+            ('Access-Control-Allow-Origin', '*'),
+        ]
+        if request.httprequest.if_none_match.contains_weak(checksum):
+            return Response(status=304, headers=headers)
+
+        data = base64.b64decode(user.image_1920)
+        headers.append(('Content-Type', guess_mimetype(data, default='image/png')))
+        return Response(data, status=200, headers=headers)
+
+    # -------------------------------------------------------------
+    # Helper: keep only values that differ from the stored ones
+    # -------------------------------------------------------------
+    def _changed_values(self, record, vals, image_checksum=None):
+        current = record.sudo().with_context(bin_size=True).read(list(vals))[0]
+        changed = {}
+        for field, value in vals.items():
+            old = current[field]
+            if isinstance(old, tuple):  # many2one → (id, display_name)
+                old = old[0]
+            if field == 'image_1920' and value:
+                # Compare digests against the stored attachment, not the blobs
+                if old and self._image_checksum(record) == image_checksum:
+                    continue
+            elif old == value:
+                continue
+            changed[field] = value
+        return changed
+
+    def _image_checksum(self, user):
+        attachment = request.env['ir.attachment'].sudo().search_read([
+            ('res_model', '=', 'res.partner'),
+            ('res_field', '=', 'image_1920'),
+            ('res_id', '=', user.partner_id.id),
+        ], ['checksum'], limit=1)
+        return attachment[0]['checksum'] if attachment else None
+
     # -------------------------------------------------------------
     # PUT/PATCH/POST /api/v1/profile/update → Update profile
     # -------------------------------------------------------------
@@ -157,38 +304,45 @@ class ProfileAPI(http.Controller):
                 "error": "Invalid JSON body"
             }, status=400)
 
-        allowed_user_fields = {'name', 'email', 'phone', 'mobile', 'image_1920'}
-        allowed_partner_fields = {'street', 'street2', 'city', 'zip', 'country_id', 'state_id'}
-
         user_vals = {}
         partner_vals = {}
+        image_checksum = None
 
         for key, value in payload.items():
-            if key in allowed_user_fields:
+            if key in PROFILE_USER_FIELDS:
                 if key == 'image_1920' and value:
                     try:
-                        if ',' in value:  # data:image/...;base64,
-                            value = value.split(',', 1)[1]
-                        raw_image = base64.b64decode(value)
-                        if len(raw_image) > 4 * 1024 * 1024:  # 4MB limit
+                        comma = value.find(',', 0, 100)  # data:image/...;base64,
+                        if comma != -1:
+                            value = value[comma + 1:]
+                        if len(value) > MAX_IMAGE_B64_LEN:
                             return self._json_response({
                                 "success": False,
                                 "error": "Image file too large (max 4MB)"
                             }, status=400)
-                        # Very basic format check
-                        if not raw_image.startswith((b'\x89PNG', b'\xff\xd8\xff', b'GIF8')):
+                        # Decode the whole string so malformed base64 is a 400
+                        # here rather than an error out of the write below
+                        try:
+                            image = base64.b64decode(value, validate=True)
+                        except binascii.Error:
+                            return self._json_response({
+                                "success": False,
+                                "error": "Invalid image data"
+                            }, status=400)
+                        if not image.startswith(IMAGE_SIGNATURES):
                             return self._json_response({
                                 "success": False,
                                 "error": "Unsupported image format"
                             }, status=400)
-                        user_vals[key] = raw_image
+                        user_vals[key] = value
+                        image_checksum = hashlib.sha1(image).hexdigest()
                     except Exception:
                         continue
                 else:
                     user_vals[key] = value or False
 
-            elif key in allowed_partner_fields:
-                if key in ('country_id', 'state_id') and value:
+            elif key in PROFILE_PARTNER_FIELDS:
+                if key in PROFILE_ID_FIELDS and value:
                     try:
                         value = int(value)
                     except (ValueError, TypeError):
@@ -207,6 +361,12 @@ class ProfileAPI(http.Controller):
                     "error": "Email address already in use by another user"
                 }, status=400)
 
+        # Skip fields that already hold the submitted value
+        if user_vals:
+            user_vals = self._changed_values(user, user_vals, image_checksum)
+        if partner_vals:
+            partner_vals = self._changed_values(user.partner_id, partner_vals)
+
         if user_vals:
             user.sudo().write(user_vals)
         if partner_vals:
@@ -223,20 +383,21 @@ class ProfileAPI(http.Controller):
     # -------------------------------------------------------------
     @http.route('/api/v1/profile/change-password', type='http', auth='none', methods=['POST'], csrf=False, cors="*")
     def change_password(self):
-        client_ip = request.httprequest.remote_addr
+        httprequest = request.httprequest
+        client_ip = httprequest.remote_addr
         now = datetime.datetime.now().isoformat()
 
         # 1. Authenticate Request
         try:
             user = self._authenticate_bearer()
         except AccessDenied as e:
-            _logger.warning(f"[{now}] Unauthorized access attempt from {client_ip}: {str(e)}")
+            _logger.warning("[%s] Unauthorized access attempt from %s: %s", now, client_ip, e)
             return self._json_response({"success": False, "error": "Unauthorized"}, status=401)
 
         # 2. Parse JSON Body
         try:
             # Ensure the client sends 'Content-Type: application/json'
-            data = request.httprequest.get_json() or {}
+            data = httprequest.get_json() or {}
         except Exception:
             return self._json_response({
                 "success": False,
@@ -244,12 +405,12 @@ class ProfileAPI(http.Controller):
             }, status=400)
 
         # 3. Extract and Clean Data
-        current_pwd = data.get('current_password', '').strip()
-        new_pwd = data.get('new_password', '').strip()
-        confirm_pwd = data.get('confirm_password', '').strip()
+        current_pwd = (data.get('current_password') or '').strip()
+        new_pwd = (data.get('new_password') or '').strip()
+        confirm_pwd = (data.get('confirm_password') or '').strip()
 
         # 4. Preliminary Validations
-        if not all([current_pwd, new_pwd, confirm_pwd]):
+        if not (current_pwd and new_pwd and confirm_pwd):
             return self._json_response({
                 "success": False,
                 "error": "All fields required: current_password, new_password, confirm_password"
@@ -267,6 +428,12 @@ class ProfileAPI(http.Controller):
                                        status=400)
 
         # 5. Verify Current Credentials (Odoo 18 Fix)
+        # Throttle before the password hash check, which is the expensive step
+        if not _password_attempt_allowed(client_ip):
+            _logger.warning("[%s] Too many password change attempts from %s", now, client_ip)
+            return self._json_response({"success": False, "error": "Too many attempts, try again later"},
+                                       status=429)
+
         try:
             # Odoo 18 expects a credential dictionary, not a string
             credentials = {
@@ -276,10 +443,10 @@ class ProfileAPI(http.Controller):
             # We check against the user's specific environment
             user.with_user(user)._check_credentials(credentials, {'interactive_login': True})
         except AccessDenied:
-            _logger.warning(f"[{now}] Incorrect current password for {user.login} from {client_ip}")
+            _logger.warning("[%s] Incorrect current password for %s from %s", now, user.login, client_ip)
             return self._json_response({"success": False, "error": "Current password is incorrect"}, status=401)
         except Exception as e:
-            _logger.error(f"Error during credential check: {str(e)}")
+            _logger.error("Error during credential check: %s", e)
             return self._json_response({"success": False, "error": "Authentication system error"}, status=500)
 
         # 6. Update Password and Persist
@@ -290,9 +457,9 @@ class ProfileAPI(http.Controller):
             # Manual commit ensures the DB is updated before the response is sent
             request.env.cr.commit()
 
-            _logger.info(f"[{now}] Password successfully changed for {user.login} (ID: {user.id})")
+            _logger.info("[%s] Password successfully changed for %s (ID: %s)", now, user.login, user.id)
             return self._json_response({"success": True, "message": "Password changed successfully"}, status=200)
 
         except Exception as e:
-            _logger.error(f"Database error during password update: {str(e)}")
+            _logger.error("Database error during password update: %s", e)
             return self._json_response({"success": False, "error": "Internal server error"}, status=500)
\ No newline at end of file
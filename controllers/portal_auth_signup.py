@@ -7,21 +7,36 @@ from odoo import http, fields
 from odoo.http import request
 from odoo.exceptions import ValidationError, AccessError
 
+from .auth_internal_user_signup import is_strong_password
+
 _logger = logging.getLogger(__name__)
 
 # ----------------------------------------------------------------------
 # Regexes (centralised – easy to tweak)
 # ----------------------------------------------------------------------
-EMAIL_REGEX = re.compile(
-    r"^(?=.{1,254}$)(?=.{1,64}@)[a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+"
-    r"(?:\.[a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+)*@"
+EMAIL_LOCAL_REGEX = re.compile(
+    r"[a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+)
+EMAIL_DOMAIN_REGEX = re.compile(
     r"[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?"
-    r"(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$"
+    r"(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*"
 )
 PHONE_REGEX = re.compile(r"^\+?[1-9]\d{1,14}$")  # E.164-ish
-PASSWORD_REGEX = re.compile(
-    r"^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$"
-)
+NON_DIGITS_REGEX = re.compile(r"[^0-9]")
+
+
+def is_valid_email(email):
+    """
+    Length-check first, then match the local and domain parts separately;
+    neither pattern can see more than 64 / 254 characters.
+    """
+    at = email.rfind("@")
+    if at < 1 or len(email) > 254 or at > 64:
+        return False
+    return bool(
+        EMAIL_LOCAL_REGEX.fullmatch(email, 0, at)
+        and EMAIL_DOMAIN_REGEX.fullmatch(email, at + 1)
+    )
 
 
 class GuestUser(http.Controller):
@@ -47,10 +62,10 @@ class GuestUser(http.Controller):
         if request.httprequest.mimetype != "application/json":
             return self._json_error("Unsupported Media Type – expected application/json", 415)
 
-        try:
-            data = json.loads(request.httprequest.data)
-        except json.JSONDecodeError as exc:
-            return self._json_error(f"Invalid JSON: {exc}", 400)
+        # type="json": the body was already parsed by the JSON-RPC dispatcher
+        data = request.dispatcher.jsonrequest
+        if not isinstance(data, dict):
+            return self._json_error("Invalid JSON: expected an object", 400)
 
         # --------------------------------------------------------------
         # 2. Required fields
@@ -62,6 +77,12 @@ class GuestUser(http.Controller):
                 f"Missing required fields: {', '.join(missing)}", 400
             )
 
+        not_text = [f for f in REQUIRED if not isinstance(data[f], str)]
+        if not_text:
+            return self._json_error(
+                f"Fields must be strings: {', '.join(not_text)}", 400
+            )
+
         email = data["email"].strip().lower()
         password = data["password"]
         name = data["name"].strip()
@@ -70,11 +91,11 @@ class GuestUser(http.Controller):
         # 3. Field validation
         # --------------------------------------------------------------
         # ---- email ----------------------------------------------------
-        if not EMAIL_REGEX.match(email):
+        if not is_valid_email(email):
             return self._json_error("Invalid e-mail address", 400)
 
         # ---- password -------------------------------------------------
-        if not PASSWORD_REGEX.match(password):
+        if not is_strong_password(password):
             return self._json_error(
                 "Password must contain at least 8 characters, "
                 "one uppercase, one lowercase, one digit and one special character (@$!%*?&)",
@@ -84,7 +105,7 @@ class GuestUser(http.Controller):
         # ---- optional phone -------------------------------------------
         phone = data.get("phone")
         if phone:
-            phone = "".join(filter(str.isdigit, phone.lstrip("+")))
+            phone = NON_DIGITS_REGEX.sub("", phone)
             if not (10 <= len(phone) <= 15):
                 return self._json_error("Phone number must be 10–15 digits", 400)
             phone = "+" + phone
@@ -92,7 +113,10 @@ class GuestUser(http.Controller):
         # --------------------------------------------------------------
         # 4. Duplicate check
         # --------------------------------------------------------------
-        if request.env["res.users"].sudo().search([("login", "=", email)], limit=1):
+        # Plain existence probe; also catches archived users, which the
+        # unique login constraint would reject at create time anyway
+        request.env.cr.execute("SELECT 1 FROM res_users WHERE login = %s LIMIT 1", (email,))
+        if request.env.cr.fetchone():
             return self._json_error("E-mail already registered", 409)
 
         # --------------------------------------------------------------
@@ -101,14 +125,11 @@ class GuestUser(http.Controller):
         country_id = False
         country_code = data.get("country_code")
         if country_code:
-            country = (
-                request.env["res.country"]
-                .sudo()
-                .search([("code", "=ilike", country_code)], limit=1)
-            )
-            if not country:
+            if not isinstance(country_code, str):
+                return self._json_error("Field must be a string: country_code", 400)
+            country_id = request.env["res.country"]._get_country_id_by_code(country_code.strip().upper())
+            if not country_id:
                 return self._json_error(f"Country code '{country_code}' not found", 400)
-            country_id = country.id
 
         # --------------------------------------------------------------
         # 6. DB transaction (savepoint)
@@ -130,8 +151,11 @@ class GuestUser(http.Controller):
                 partner = request.env["res.partner"].sudo().create(partner_vals)
 
                 # ---- portal group -------------------------------------------
-                portal_group = request.env.ref("base.group_portal")
-                if not portal_group:
+                # Resolved through ir.model.data's ormcache; no query after the first call
+                portal_group_id = request.env["ir.model.data"]._xmlid_to_res_id(
+                    "base.group_portal", raise_if_not_found=False
+                )
+                if not portal_group_id:
                     raise ValidationError("Portal group missing – contact administrator")
                 # ---- user ---------------------------------------------------
 
@@ -140,7 +164,7 @@ class GuestUser(http.Controller):
                     "login": email,
                     "password": password,
                     "partner_id": partner.id,
-                    "groups_id": [(6, 0, [portal_group.id])],
+                    "groups_id": [(6, 0, [portal_group_id])],
                 })
 
                 # ---- double-opt-in token (recommended) --------------------
@@ -185,7 +209,7 @@ class GuestUser(http.Controller):
 
         # Raw HTTP request → return real Response with correct status
         return request.make_response(
-            json.dumps(response, ensure_ascii=False),
+            json.dumps(response, ensure_ascii=False, separators=(',', ':')).encode(),
             headers=[("Content-Type", "application/json")],
             status=status,
         )
\ No newline at end of file
@@ -1,12 +1,33 @@
 from odoo import http
 from odoo.http import request, Response
+import hashlib
 import json
-import math
+from collections import defaultdict
 from odoo.exceptions import AccessError, ValidationError  # Import AccessError and ValidationError
 import logging
 
+from .worker_cache import TTLCache, claim, release
+
 _logger = logging.getLogger(__name__)
 
+# Per-worker cache of serialized public listing bodies
+_LISTING_CACHE = TTLCache(ttl=60, size=1024)
+# Seconds a request waits for an identical listing already being computed
+_LISTING_INFLIGHT_WAIT = 10
+# Listing totals stop counting here unless the caller asks for an exact count
+_LISTING_COUNT_CAP = 10000
+# Most products returned by one /api/v1/products/by_subcategory call
+_BY_SUBCATEGORY_LIMIT = 500
+
+
+def _listing_cache_key(endpoint, params):
+    """Key a listing body on everything that shapes it: user, website, language and query."""
+    website = getattr(request, 'website', None)
+    return (
+        request.env.cr.dbname, endpoint, request.env.uid, website.id if website else None,
+        request.env.lang, tuple(sorted((k, str(v)) for k, v in params.items())),
+    )
+
 
 class ProductAPI(http.Controller):
 
@@ -27,7 +48,21 @@ class ProductAPI(http.Controller):
             category_id (int)   – root public category
             search (str)        – free-text on name / sale description
             sort (str)          – price_asc|price_desc|name_asc|name_desc|newest
+            force_count (0/1)   – count past 10000 instead of capping the total
         """
+        cache_key = _listing_cache_key('products', kwargs)
+        body = _LISTING_CACHE.get(cache_key)
+        if body is not None:
+            return self._etag_response(body, 'application/json; charset=utf-8')
+
+        # Identical searches arriving together share one computation: the
+        # followers wait for the first one and serve the body it cached.
+        owner = claim(cache_key, _LISTING_INFLIGHT_WAIT)
+        if not owner:
+            body = _LISTING_CACHE.get(cache_key)
+            if body is not None:
+                return self._etag_response(body, 'application/json; charset=utf-8')
+
         try:
             # ------------------------------------------------------------------
             # 1. Input validation (defensive)
@@ -37,6 +72,7 @@ class ProductAPI(http.Controller):
             category_id = kwargs.get('category_id')
             search = (kwargs.get('search') or '').strip()[:100]
             sort = kwargs.get('sort')
+            count_limit = None if kwargs.get('force_count') == '1' else _LISTING_COUNT_CAP
 
             # ------------------------------------------------------------------
             # 2. Base domain – only published & saleable products
@@ -44,7 +80,12 @@ class ProductAPI(http.Controller):
             domain = [('website_published', '=', True), ('sale_ok', '=', True)]
 
             if category_id and category_id.isdigit():
-                domain = domain + [('public_categ_ids', 'child_of', int(category_id))]
+                # Resolve the (small) category subtree first so the product search
+                # filters on a plain id list instead of a nested child_of subquery
+                descendant_ids = request.env['product.public.category'].search(
+                    [('id', 'child_of', int(category_id))]
+                ).ids
+                domain = domain + [('public_categ_ids', 'in', descendant_ids)]
 
             if search:
                 domain = domain + [
@@ -69,17 +110,32 @@ class ProductAPI(http.Controller):
             # 4. Search (public rights – no sudo)
             # ------------------------------------------------------------------
             ProductTemplate = request.env['product.template']
-            products = ProductTemplate.search(
-                domain, offset=(page - 1) * limit, limit=limit, order=order
+            offset = (page - 1) * limit
+            # search_fetch loads the stored columns read below in the same query
+            # as the search, so the later read() is served from the cache
+            products = ProductTemplate.search_fetch(
+                domain,
+                ['name', 'default_code', 'list_price', 'website_description', 'description_sale'],
+                offset=offset, limit=limit, order=order,
             )
-            total = ProductTemplate.search_count(domain)
+            # A partial page is the last one, so the total is known without a
+            # second query; an empty page past the end still needs the count.
+            total_is_approx = False
+            if products and len(products) < limit or not products and not offset:
+                total = offset + len(products)
+            else:
+                # Stops at the cap: deep catalogues report a lower bound
+                total = ProductTemplate.search_count(domain, limit=count_limit)
+                total_is_approx = bool(count_limit) and total >= count_limit
 
             # ------------------------------------------------------------------
             # 5. Pricelist & website context
             # ------------------------------------------------------------------
-            website = request.env['website'].get_current_website()
-            pricelist = website.pricelist_id or request.env['product.pricelist'].search(
-                [('active', '=', True)], limit=1
+            # The http layer already resolved the website for this request
+            website = getattr(request, 'website', None) or request.env['website'].get_current_website()
+            Pricelist = request.env['product.pricelist']
+            pricelist = website.pricelist_id or Pricelist.browse(
+                Pricelist._get_default_pricelist_id(request.env.company.id)
             )
             base_url = (
                 request.env['ir.config_parameter']
@@ -88,69 +144,103 @@ class ProductAPI(http.Controller):
                 .rstrip('/')
             )
 
+            # ---- pricing: one pricelist pass for the whole page ---------------
+            # {variant_id: price}, computed on each template's first variant
+            variant_prices = {}
+            if pricelist:
+                variants = products.product_variant_id
+                try:
+                    if not pricelist.item_ids and pricelist.currency_id == request.env.company.currency_id:
+                        # No rules and no conversion: the pricelist price is the
+                        # variant's sales price, so skip rule evaluation entirely
+                        variant_prices = {v['id']: v['lst_price'] for v in variants.read(['lst_price'])}
+                    else:
+                        variant_prices = pricelist._get_products_price(variants, 1.0)
+                except Exception as exc:  # pragma: no cover
+                    _logger.warning("Pricelist error for templates %s: %s", products.ids, exc)
+
+            # ---- stock: on-hand quantities summed in SQL from stock.quant ------
+            # {template_id: on-hand quantity in internal locations, all variants}
+            stock_by_tmpl = defaultdict(float)
+            try:
+                # {variant_id: template_id}
+                tmpl_of = {
+                    v['id']: v['product_tmpl_id']
+                    for v in products.product_variant_ids.read(['product_tmpl_id'], load=None)
+                }
+                quant_groups = request.env['stock.quant'].sudo().read_group(
+                    [
+                        ('product_id', 'in', list(tmpl_of)),
+                        ('location_id.usage', '=', 'internal'),
+                        ('company_id', 'in', request.env.companies.ids),
+                    ],
+                    ['quantity:sum'], ['product_id'],
+                )
+                for group in quant_groups:
+                    stock_by_tmpl[tmpl_of[group['product_id'][0]]] += group['quantity'] or 0.0
+            except Exception as e:
+                _logger.warning("Stock computation failed for templates %s: %s", products.ids, e)
+
+            # ---- one batched read of every field the loop consumes -----------
+            rows = products.read([
+                'name', 'default_code', 'list_price', 'website_description', 'description_sale',
+                'public_categ_ids', 'product_variant_id',
+            ], load=None)
+            # {category_id: (sequence, display_name)} for all categories on the page
+            categ_info = {
+                c['id']: (c['sequence'], c['display_name'])
+                for c in products.public_categ_ids.read(['sequence', 'display_name'])
+            }
+            # bin_size returns the image size instead of the blob; only presence matters here
+            has_image = {
+                r['id']: bool(r['image_1920'])
+                for r in products.with_context(bin_size=True).read(['image_1920'])
+            }
+            currency = pricelist.currency_id.name if pricelist and pricelist.currency_id else 'USD'
+
             # ------------------------------------------------------------------
             # 6. Build response payload
             # ------------------------------------------------------------------
             product_list = []
-            for tmpl in products:
+            for row in rows:
+                tmpl_id = row['id']
+
                 # ---- pricing -------------------------------------------------
-                price = float(tmpl.list_price or 0.0)
-
-                if pricelist and tmpl.product_variant_ids:
-                    variant = tmpl.product_variant_id  # first variant (standard)
-                    if variant:
-                        try:
-                            price = pricelist.get_product_price(
-                                variant, 1.0, partner=False
-                            )
-                        except Exception as exc:  # pragma: no cover
-                            _logger.warning(
-                                "Pricelist error for %s (tmpl %s): %s",
-                                tmpl.name, tmpl.id, exc,
-                            )
+                price = variant_prices.get(row['product_variant_id'], float(row['list_price'] or 0.0))
                 price = round(price, 2)
 
-                # ---- full name (with attributes) -----------------------------
-                full_name = tmpl.display_name
-
                 # ---- categories -----------------------------------------------
-                categories = []
-                primary_category = ''
-                if tmpl.public_categ_ids:
-                    sorted_cats = tmpl.public_categ_ids.sorted('sequence')
-                    categories = [c.display_name for c in sorted_cats]
-                    primary_category = sorted_cats[0].display_name if sorted_cats else ''
+                category_ids = row['public_categ_ids']
+                categories = [
+                    categ_info[cid][1]
+                    for cid in sorted(category_ids, key=lambda cid: categ_info[cid][0])
+                ]
+                primary_category = categories[0] if categories else ''
 
                 # ---- image ----------------------------------------------------
                 image_url = (
-                    f"{base_url}/web/image/product.template/{tmpl.id}/image_1920"
-                    if tmpl.image_1920
+                    f"{base_url}/web/image/product.template/{tmpl_id}/image_1920"
+                    if has_image.get(tmpl_id)
                     else ''
                 )
 
-                # ---- stock (aggregate from variants) -------------------------
-                # ---- stock (safe for public API) ----
-                stock_qty = 0
-                in_stock = False
-                if tmpl.product_variant_ids:
-                    try:
-                        stock_qty = sum(v.sudo().qty_available for v in tmpl.product_variant_ids)
-                        in_stock = stock_qty > 0
-                    except Exception as e:
-                        _logger.warning("Stock computation failed for product %s: %s", tmpl.id, e)
+                # ---- stock (aggregated from variants above) ------------------
+                stock_qty = stock_by_tmpl.get(tmpl_id, 0)
+                in_stock = stock_qty > 0
 
                 product_list.append({
-                    'id': tmpl.id,
-                    'name': full_name,
+                    'id': tmpl_id,
+                    # Same text as display_name, composed from the fetched columns
+                    'name': f"[{row['default_code']}] {row['name']}" if row['default_code'] else row['name'],
                     'price': price,
-                    'currency': pricelist.currency_id.name if pricelist and pricelist.currency_id else 'USD',
-                    'description': tmpl.website_description or tmpl.description_sale or '',
+                    'currency': currency,
+                    'description': row['website_description'] or row['description_sale'] or '',
                     'image_url': image_url,
                     'stock': int(stock_qty),
                     'in_stock': in_stock,
                     'primary_category': primary_category,
                     'categories': categories,
-                    'category_ids': tmpl.public_categ_ids.ids,
+                    'category_ids': category_ids,
                 })
 
             # ------------------------------------------------------------------
@@ -163,19 +253,15 @@ class ProductAPI(http.Controller):
                     "page": page,
                     "limit": limit,
                     "total": total,
-                    "pages": math.ceil(total / limit) if limit else 1,
+                    "pages": -(-total // limit) if limit else 1,
+                    "total_is_approx": total_is_approx,
                 },
             }
 
-            headers = {
-                'Content-Type': 'application/json; charset=utf-8',
-                'Access-Control-Allow-Origin': '*',
-            }
-            return Response(
-                json.dumps(payload, ensure_ascii=False, default=str),
-                status=200,
-                headers=headers,
+            body = _LISTING_CACHE.set(
+                cache_key, json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode()
             )
+            return self._etag_response(body, 'application/json; charset=utf-8')
 
         # ----------------------------------------------------------------------
         # Error handling
@@ -194,6 +280,26 @@ class ProductAPI(http.Controller):
                 status=500,
                 headers={'Content-Type': 'application/json'},
             )
+        finally:
+            if owner:
+                release(cache_key)
+
+    def _etag_response(self, body, content_type):
+        """
+        200 with an ETag over the body, or an empty 304 when the client already
+        holds that exact body (If-None-Match). Stock and pricelist changes do not
+        touch product write dates, so the tag is taken from the rendered body.
+        """
+        digest = hashlib.md5(body).hexdigest()
+        headers = [
+            ('ETag', 'W/"%s"' % digest),
+            ('Cache-Control', 'no-cache'),
+            ('Access-Control-Allow-Origin', '*'),
+        ]
+        if request.httprequest.if_none_match.contains_weak(digest):
+            return Response(status=304, headers=headers)
+        headers.append(('Content-Type', content_type))
+        return Response(body, status=200, headers=headers)
 
     def _get_product_price(self, product, pricelist):
         """Get product price considering pricelist rules"""
@@ -220,7 +326,8 @@ class ProductAPI(http.Controller):
         return price
 
     def _get_image_url(self, product):
-        if product.image_1920:
+        # bin_size: only presence matters, so fetch the size, not the blob
+        if product.with_context(bin_size=True).image_1920:
             base_url = request.httprequest.host_url.strip('/')
             return f"{base_url}/web/image/product.template/{product.id}/image_1920/"
         return ''
@@ -228,6 +335,11 @@ class ProductAPI(http.Controller):
     @http.route('/api/v1/categories', type='http', auth='public', methods=['GET'], csrf=False, cors='*')
     def list_categories(self, **kwargs):
         """List categories or subcategories based on parent_id."""
+        cache_key = _listing_cache_key('categories', kwargs)
+        body = _LISTING_CACHE.get(cache_key)
+        if body is not None:
+            return self._etag_response(body, 'application/json')
+
         try:
             parent_id = kwargs.get('parent_id')
             domain = []
@@ -259,30 +371,31 @@ class ProductAPI(http.Controller):
             else:
                 domain.append(('parent_id', '=', False))
 
-            categories = request.env['product.public.category'].sudo().search(domain)
-            _logger.info("Found %d categories for parent_id %s", len(categories), parent_id or 'None')
+            Category = request.env['product.public.category'].sudo()
+            fields_to_read = ['name', 'parent_id', 'image_1920', 'product_count']
+            if 'description' in Category._fields:
+                fields_to_read.append('description')
+            # One query for exactly the columns we serialize; bin_size returns the
+            # image size instead of the blob, since only its presence is needed
+            rows = Category.with_context(bin_size=True).search_read(domain, fields_to_read, load=None)
+            _logger.info("Found %d categories for parent_id %s", len(rows), parent_id or 'None')
 
             result = {
                 'categories': [
                     {
-                        'id': category.id,
-                        'name': category.with_context(lang=request.env.context.get('lang', 'en_US')).name,
-                        'parent_id': category.parent_id.id if category.parent_id else None,
-                        'image_url': f"/web/image/product.public.category/{category.id}/image_1920" if category.image_1920 else '',
-                        'description': getattr(category, 'description', '') or '',
-                        'product_count': request.env['product.template'].sudo().search_count([
-                            ('public_categ_ids', 'in', [category.id])
-                        ])
+                        'id': row['id'],
+                        'name': row['name'],
+                        'parent_id': row['parent_id'] or None,
+                        'image_url': f"/web/image/product.public.category/{row['id']}/image_1920" if row['image_1920'] else '',
+                        'description': row.get('description') or '',
+                        'product_count': row['product_count'],
                     }
-                    for category in categories
+                    for row in rows
                 ]
             }
 
-            return http.Response(
-                json.dumps(result),
-                status=200,
-                mimetype='application/json'
-            )
+            body = _LISTING_CACHE.set(cache_key, json.dumps(result, separators=(',', ':')).encode())
+            return self._etag_response(body, 'application/json')
         except AccessError:
             _logger.warning("AccessError in list_categories for parent_id %s", parent_id or 'None')
             return http.Response(
@@ -306,72 +419,58 @@ class ProductAPI(http.Controller):
         - limit: Maximum number of root-level categories to return (default: 100).
         - Returns: JSON response with list of dicts containing id, name, parent_id as [id, name], and children (recursive hierarchy).
         """
+        cache_key = _listing_cache_key('subcategories', dict(kwargs, parent_id=parent_id, limit=limit))
+        body = _LISTING_CACHE.get(cache_key)
+        if body is not None:
+            return self._etag_response(body, 'application/json')
+
         # Validate and convert parent_id
         try:
             parent_id = int(parent_id) if parent_id else None
         except (ValueError, TypeError):
             return request.make_json_response({'error': 'Invalid parent_id format'}, status=400)
 
-        # Fetch ALL categories once for efficiency
-        all_categories = request.env['product.public.category'].sudo().search_read(
-            fields=['id', 'name', 'parent_id'],
-            order='name'
-        )
-
-        if not all_categories:
-            return request.make_json_response({'error': 'No categories found'}, status=404)
-
-        # Build complete parent_data map: {parent_id: name} for all categories
-        parent_data = {cat['id']: cat['name'] for cat in all_categories}
-
-        # Build children_map: {parent_id: [child_cats]} for fast lookups
-        children_map = {}
-        for cat in all_categories:
-            parent_id_val = cat.get('parent_id')
-            if parent_id_val:
-                parent_id_int = parent_id_val[0]
-                if parent_id_int not in children_map:
-                    children_map[parent_id_int] = []
-                children_map[parent_id_int].append(cat)
-            # Top-level have no entry in children_map
-
-        # Determine root categories based on parent_id and limit
-        if parent_id:
-            root_categories = children_map.get(parent_id, [])
-        else:
-            root_categories = [cat for cat in all_categories if not cat.get('parent_id')]
+        try:
+            limit = int(limit)
+        except (ValueError, TypeError):
+            return request.make_json_response({'error': 'Invalid limit format'}, status=400)
 
-        root_categories = root_categories[:int(limit)]  # Apply limit to roots
+        Category = request.env['product.public.category'].sudo()
 
-        if not root_categories:
+        # Only the requested roots (limit applied in SQL) and their subtrees,
+        # expanded through parent_path, instead of every category
+        roots = Category.search([('parent_id', '=', parent_id or False)], order='name', limit=limit)
+        if not roots:
             error_msg = 'No subcategories found' if parent_id else 'No top-level categories found'
             return request.make_json_response({'error': error_msg}, status=404)
 
-        # Recursive builder using pre-built maps
-        def build_hierarchy(cat):
-            # Format parent_id as [id, name]
-            parent_id_val = cat.get('parent_id')
-            if parent_id_val:
-                parent_name = parent_data.get(parent_id_val[0], 'Unknown')
-                cat['parent_id'] = [parent_id_val[0], parent_name]
-            else:
-                cat['parent_id'] = False
+        categories = Category.search_read(
+            [('id', 'child_of', roots.ids)], fields=['id', 'name', 'parent_id'], order='name', load=None
+        )
 
-            # Get and recurse children
-            child_cats = children_map.get(cat['id'], [])
-            cat['children'] = [build_hierarchy(child) for child in child_cats]
+        # One output node per category, then link every node under its parent.
+        # categories is name-ordered, so children keep that order.
+        nodes = {cat['id']: {
+            'id': cat['id'],
+            'name': cat['name'],
+            'parent_id': False,
+            'children': [],
+        } for cat in categories}
+        if parent_id:
+            parent_ref = [parent_id, Category.browse(parent_id).name]
+            for root_id in roots.ids:
+                nodes[root_id]['parent_id'] = parent_ref
+        for cat in categories:
+            parent_node = nodes.get(cat['parent_id'])
+            if parent_node:
+                node = nodes[cat['id']]
+                node['parent_id'] = [parent_node['id'], parent_node['name']]
+                parent_node['children'].append(node)
 
-            # Prune to desired fields
-            return {
-                'id': cat['id'],
-                'name': cat['name'],
-                'parent_id': cat['parent_id'],
-                'children': cat['children']
-            }
+        hierarchy = [nodes[root_id] for root_id in roots.ids]
 
-        # Build hierarchy for roots
-        hierarchy = [build_hierarchy(cat) for cat in root_categories]
-        return request.make_json_response(hierarchy, status=200)
+        body = _LISTING_CACHE.set(cache_key, json.dumps(hierarchy, ensure_ascii=False, separators=(',', ':')).encode())
+        return self._etag_response(body, 'application/json')
 
 
     @http.route('/api/v1/products/assign', type='http', auth='user', methods=['POST'], csrf=False, cors='*')
@@ -384,7 +483,7 @@ class ProductAPI(http.Controller):
         """
         try:
             # Parse JSON body
-            body = json.loads(request.httprequest.data.decode('utf-8'))
+            body = request.get_json_data()
             product_ids = body.get('product_ids', [])
             category_ids = body.get('category_ids', [])
             replace = body.get('replace', True)  # Default: replace all cats
@@ -395,15 +494,21 @@ class ProductAPI(http.Controller):
             # Validate IDs exist
             valid_prods = request.env['product.template'].sudo().browse(product_ids).exists()
             valid_cats = request.env['product.public.category'].sudo().browse(category_ids).exists()
-            if len(valid_prods) != len(product_ids) or len(valid_cats) != len(category_ids):
-                return request.make_json_response({'error': 'Some IDs not found'}, status=404)
-
-            # Assign (batch write for efficiency)
-            assigned = []
-            for prod in valid_prods:
-                cmd = (6, 0, category_ids.ids) if replace else [(4, cid) for cid in category_ids.ids]
-                prod.sudo().write({'public_categ_ids': cmd})
-                assigned.append((prod.id, category_ids.ids))
+            # Set differences name the missing ids (and tolerate repeated ones)
+            missing_prods = set(product_ids) - set(valid_prods.ids)
+            missing_cats = set(category_ids) - set(valid_cats.ids)
+            if missing_prods or missing_cats:
+                return request.make_json_response({
+                    'error': 'Some IDs not found',
+                    'missing_product_ids': sorted(missing_prods),
+                    'missing_category_ids': sorted(missing_cats),
+                }, status=404)
+
+            # Assign (one write for the whole recordset, without chatter tracking)
+            cat_ids = valid_cats.ids
+            cmd = [(6, 0, cat_ids)] if replace else [(4, cid) for cid in cat_ids]
+            valid_prods.with_context(tracking_disable=True).write({'public_categ_ids': cmd})
+            assigned = [(prod_id, cat_ids) for prod_id in valid_prods.ids]
 
             return request.make_json_response({'success': True, 'assigned': assigned}, status=200)
 
@@ -420,15 +525,22 @@ class ProductAPI(http.Controller):
         Example body:
         {
             "parent_id": 10,
-            "subcategory_id": 25
+            "subcategory_id": 25,
+            "limit": 100,           (optional, 1-500, default 500)
+            "offset": 0             (optional, default 0)
         }
+        Products come in the /api/v1/allproduct default order
+        (website_sequence DESC, id DESC); page through a large category by
+        raising offset by limit.
         """
         try:
-            # Safely get the JSON body
-            data = request.jsonrequest if hasattr(request, 'jsonrequest') else request.httprequest.get_json(force=True)
+            # type='json': the body was already parsed by the JSON-RPC dispatcher
+            data = request.dispatcher.jsonrequest
 
             parent_id = data.get('parent_id')
             subcategory_id = data.get('subcategory_id')
+            limit = min(_BY_SUBCATEGORY_LIMIT, max(1, int(data.get('limit') or _BY_SUBCATEGORY_LIMIT)))
+            offset = max(0, int(data.get('offset') or 0))
 
             if not parent_id or not subcategory_id:
                 return {'error': 'Both parent_id and subcategory_id are required.'}
@@ -446,29 +558,45 @@ class ProductAPI(http.Controller):
             if subcategory.parent_id.id != parent.id:
                 return {'error': f'Subcategory "{subcategory.name}" does not belong to parent "{parent.name}".'}
 
-            # Search products under subcategory
-            products = request.env['product.template'].sudo().search([
+            # Search products under subcategory, reading every projected column
+            # (and the stock compute) for the whole result at once; the result
+            # is capped so a large category cannot produce an unbounded payload
+            ProductTemplate = request.env['product.template'].sudo()
+            domain = [
                 ('public_categ_ids', 'child_of', subcategory.id),
                 ('sale_ok', '=', True),
                 ('website_published', '=', True),
-            ])
+            ]
+            rows = ProductTemplate.search_read(
+                domain, ['name', 'list_price', 'currency_id', 'website_description', 'qty_available'],
+                offset=offset, limit=limit, order='website_sequence DESC, id DESC',
+            )
+            # A short, non-empty page is the last one, so it already gives the total
+            if 0 < len(rows) < limit or not (rows or offset):
+                total = offset + len(rows)
+            else:
+                total = ProductTemplate.search_count(domain)
+            subcategory_name = subcategory.name
+            parent_name = parent.name
 
             result = [{
-                'id': p.id,
-                'name': p.name,
-                'price': p.list_price,
-                'currency': p.currency_id.name,
-                'subcategory': subcategory.name,
-                'parent_category': parent.name,
-                'description': p.website_description or '',
-                'image_url': f"/web/image/product.template/{p.id}/image_1920",
-                'available_in_stock': p.qty_available,
-            } for p in products]
+                'id': r['id'],
+                'name': r['name'],
+                'price': r['list_price'],
+                'currency': r['currency_id'][1] if r['currency_id'] else False,
+                'subcategory': subcategory_name,
+                'parent_category': parent_name,
+                'description': r['website_description'] or '',
+                'image_url': f"/web/image/product.template/{r['id']}/image_1920",
+                'available_in_stock': r['qty_available'],
+            } for r in rows]
 
             return {
                 'parent_category': {'id': parent.id, 'name': parent.name},
                 'subcategory': {'id': subcategory.id, 'name': subcategory.name},
-                'total_products': len(result),
+                'total_products': total,
+                'offset': offset,
+                'limit': limit,
                 'products': result,
             }
 
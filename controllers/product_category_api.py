@@ -1,4 +1,8 @@
 # controllers/product_category_api.py
+# Not loaded: controllers/__init__.py does not import this module. Its
+# /shop/category/<int:category_id> route would shadow website_sale's own
+# category pages, and shop_category_api serves the category listing instead.
+# Keep model changes out of here; nothing in this file is reachable.
 from odoo import http
 from odoo.http import request
 from odoo.tools import slug
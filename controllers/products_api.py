@@ -1,7 +1,8 @@
-from odoo import http
-from odoo.http import request, Response
+from odoo import http, Command
+from odoo.http import request
+from odoo.tools import SQL
 import json
-import math
+from collections import defaultdict
 from odoo.exceptions import AccessError, ValidationError  # Import AccessError and ValidationError
 import logging
 
@@ -9,193 +10,6 @@ _logger = logging.getLogger(__name__)
 
 
 class ProductAPI(http.Controller):
-    @http.route(
-        '/api/v1/products',
-        type='http',
-        auth='public',
-        csrf=False,
-        methods=['GET'],
-        cors='*'
-    )
-    def list_products(self, **kwargs):
-        """
-        Public product catalogue endpoint (pure JSON via HTTP - no jsonrpc wrapper).
-
-        Query parameters:
-            page (int)          default: 1
-            limit (int)         1–100, default: 20
-            category_id (int)   public category root ID
-            search (str)        search in name or sale description
-            sort (str)          price_asc | price_desc | name_asc | name_desc | newest
-
-        Returns clean JSON with products, prices (via pricelist), and pagination.
-        """
-        try:
-            # 1. Input validation
-            page = max(1, int(kwargs.get('page', 1)))
-            limit = min(100, max(1, int(kwargs.get('limit', 20))))
-            category_id_str = kwargs.get('category_id')
-            search = (kwargs.get('search') or '').strip()[:100]
-            sort = kwargs.get('sort')
-
-            category_id = None
-            if category_id_str and category_id_str.isdigit():
-                category_id = int(category_id_str)
-
-            # 2. Domain for published & sellable products
-            domain = [
-                ('website_published', '=', True),
-                ('sale_ok', '=', True),
-            ]
-
-            if category_id:
-                domain.append(('public_categ_ids', 'child_of', category_id))
-
-            if search:
-                domain.extend([
-                    '|',
-                    ('name', 'ilike', search),
-                    ('description_sale', 'ilike', search),
-                ])
-
-            # 3. Sorting
-            sort_mapping = {
-                'price_asc': 'list_price asc',
-                'price_desc': 'list_price desc',
-                'name_asc': 'name asc',
-                'name_desc': 'name desc',
-                'newest': 'create_date desc',
-            }
-            order = sort_mapping.get(sort, 'website_sequence DESC, id DESC')
-
-            # 4. Fetch products & count
-            ProductTemplate = request.env['product.template'].sudo()
-            products = ProductTemplate.search(
-                domain,
-                offset=(page - 1) * limit,
-                limit=limit,
-                order=order
-            )
-            total_count = ProductTemplate.search_count(domain)
-
-            # 5. Website & pricelist – FIXED for Odoo 18
-            website = request.env['website'].get_current_website()
-
-            # Preferred / most reliable in Odoo 17–18 for website context
-            pricelist = website.pricelist_id
-
-            # Better: use the full context-aware helper (handles country, geoip, user, etc.)
-            if not pricelist:
-                pricelist = request.env['product.pricelist'].sudo()._get_current_pricelist()
-
-            # Ultimate fallback: any active pricelist tied to website or global
-            if not pricelist:
-                pricelist = request.env['product.pricelist'].sudo().search([
-                    ('active', '=', True),
-                    '|',
-                    ('website_id', '=', website.id),
-                    ('website_id', '=', False),
-                ], order='sequence', limit=1)
-
-            # If still nothing → fallback to list_price (no pricelist applied)
-            use_pricelist = bool(pricelist)
-
-            base_url = request.env['ir.config_parameter'].sudo().get_param(
-                'web.base.url', ''
-            ).rstrip('/')
-
-            # 6. Helper functions
-            def get_product_price(template):
-                if not use_pricelist or not template.product_variant_ids:
-                    return round(template.list_price, 2)
-
-                try:
-                    variant = template.product_variant_id  # main variant for preview
-                    # This is the stable method used in controllers / website_sale
-                    price = pricelist._get_product_price(
-                        product=variant,
-                        quantity=1,
-                        uom=variant.uom_id or template.uom_id,
-                        date=False,
-                        partner=False
-                    )
-                    return round(price, 2)
-                except Exception as exc:
-                    _logger.warning(
-                        "Price failed for template %s (%s): %s",
-                        template.id, template.name, exc
-                    )
-                    return round(template.list_price, 2)
-
-            def get_image_url(template):
-                if not template.image_1920:
-                    return ''
-                return f"{base_url}/web/image/product.template/{template.id}/image_1920"
-
-            # 7. Build product list
-            product_data = []
-            for tmpl in products:
-                product_data.append({
-                    'id': tmpl.id,
-                    'name': tmpl.name,
-                    'description_short': (tmpl.description_sale or '').strip()[:280],
-                    'price': get_product_price(tmpl),
-                    'currency': pricelist.currency_id.name if use_pricelist and pricelist.currency_id else 'USD',
-                    'image_url': get_image_url(tmpl),
-                    'public_category_ids': tmpl.public_categ_ids.ids,
-                    'website_sequence': tmpl.website_sequence,
-                    'create_date': tmpl.create_date.strftime('%Y-%m-%d') if tmpl.create_date else None,
-                    # Uncomment extras if needed:
-                    # 'default_code': tmpl.default_code or '',
-                    # 'product_url': f"{base_url}/shop/product/{tmpl.id}" if tmpl.website_published else '',
-                })
-
-            # 8. Final payload
-            response_payload = {
-                'status': 'success',
-                'data': product_data,
-                'pagination': {
-                    'current_page': page,
-                    'per_page': limit,
-                    'total_items': total_count,
-                    'total_pages': (total_count + limit - 1) // limit if limit > 0 else 1,
-                },
-                'meta': {
-                    'applied_filters': {
-                        'search': search or None,
-                        'category_id': category_id,
-                        'sort': sort or 'default (website sequence)',
-                    },
-                    'pricelist_used': pricelist.name if use_pricelist else 'No pricelist (using base price)',
-                }
-            }
-
-            return request.make_response(
-                json.dumps(response_payload, ensure_ascii=False),
-                headers={
-                    'Content-Type': 'application/json; charset=utf-8',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type, Authorization',
-                },
-                status=200
-            )
-
-        except ValueError as ve:
-            return request.make_response(
-                json.dumps({'status': 'error', 'message': f'Invalid input: {str(ve)}', 'code': 400}),
-                headers={'Content-Type': 'application/json; charset=utf-8'},
-                status=400
-            )
-
-        except Exception as e:
-            _logger.error("Error in /api/v1/products: %s", str(e), exc_info=True)
-            return request.make_response(
-                json.dumps({'status': 'error', 'message': 'Internal server error', 'code': 500}),
-                headers={'Content-Type': 'application/json; charset=utf-8'},
-                status=500
-            )
-
     @http.route('/api/v1/categories', type='http', auth='public', methods=['GET'], csrf=False, cors='*')
     def list_categories(self, **kwargs):
         """List categories or subcategories based on parent_id."""
@@ -230,22 +44,26 @@ class ProductAPI(http.Controller):
             else:
                 domain.append(('parent_id', '=', False))
 
-            categories = request.env['product.public.category'].sudo().search(domain)
-            _logger.info("Found %d categories for parent_id %s", len(categories), parent_id or 'None')
+            Category = request.env['product.public.category'].sudo()
+            fields_to_read = ['name', 'parent_id', 'image_1920', 'product_count']
+            if 'description' in Category._fields:
+                fields_to_read.append('description')
+            # One query for exactly the columns we serialize; bin_size returns the
+            # image size instead of the blob, since only its presence is needed
+            rows = Category.with_context(bin_size=True).search_read(domain, fields_to_read, load=None)
+            _logger.info("Found %d categories for parent_id %s", len(rows), parent_id or 'None')
 
             result = {
                 'categories': [
                     {
-                        'id': category.id,
-                        'name': category.with_context(lang=request.env.context.get('lang', 'en_US')).name,
-                        'parent_id': category.parent_id.id if category.parent_id else None,
-                        'image_url': f"/web/image/product.public.category/{category.id}/image_1920" if category.image_1920 else '',
-                        'description': getattr(category, 'description', '') or '',
-                        'product_count': request.env['product.template'].sudo().search_count([
-                            ('public_categ_ids', 'in', [category.id])
-                        ])
+                        'id': row['id'],
+                        'name': row['name'],
+                        'parent_id': row['parent_id'] or None,
+                        'image_url': f"/web/image/product.public.category/{row['id']}/image_1920" if row['image_1920'] else '',
+                        'description': row.get('description') or '',
+                        'product_count': row['product_count'],
                     }
-                    for category in categories
+                    for row in rows
                 ]
             }
 
@@ -283,65 +101,45 @@ class ProductAPI(http.Controller):
         except (ValueError, TypeError):
             return request.make_json_response({'error': 'Invalid parent_id format'}, status=400)
 
-        # Fetch ALL categories once for efficiency
-        all_categories = request.env['product.public.category'].sudo().search_read(
-            fields=['id', 'name', 'parent_id'],
-            order='name'
-        )
-
-        if not all_categories:
-            return request.make_json_response({'error': 'No categories found'}, status=404)
-
-        # Build complete parent_data map: {parent_id: name} for all categories
-        parent_data = {cat['id']: cat['name'] for cat in all_categories}
-
-        # Build children_map: {parent_id: [child_cats]} for fast lookups
-        children_map = {}
-        for cat in all_categories:
-            parent_id_val = cat.get('parent_id')
-            if parent_id_val:
-                parent_id_int = parent_id_val[0]
-                if parent_id_int not in children_map:
-                    children_map[parent_id_int] = []
-                children_map[parent_id_int].append(cat)
-            # Top-level have no entry in children_map
-
-        # Determine root categories based on parent_id and limit
-        if parent_id:
-            root_categories = children_map.get(parent_id, [])
-        else:
-            root_categories = [cat for cat in all_categories if not cat.get('parent_id')]
+        try:
+            limit = int(limit)
+        except (ValueError, TypeError):
+            return request.make_json_response({'error': 'Invalid limit format'}, status=400)
 
-        root_categories = root_categories[:int(limit)]  # Apply limit to roots
+        Category = request.env['product.public.category'].sudo()
 
-        if not root_categories:
+        # Only the requested roots (limit applied in SQL) and their subtrees,
+        # expanded through parent_path, instead of every category
+        roots = Category.search([('parent_id', '=', parent_id or False)], order='name', limit=limit)
+        if not roots:
             error_msg = 'No subcategories found' if parent_id else 'No top-level categories found'
             return request.make_json_response({'error': error_msg}, status=404)
 
-        # Recursive builder using pre-built maps
-        def build_hierarchy(cat):
-            # Format parent_id as [id, name]
-            parent_id_val = cat.get('parent_id')
-            if parent_id_val:
-                parent_name = parent_data.get(parent_id_val[0], 'Unknown')
-                cat['parent_id'] = [parent_id_val[0], parent_name]
-            else:
-                cat['parent_id'] = False
-
-            # Get and recurse children
-            child_cats = children_map.get(cat['id'], [])
-            cat['children'] = [build_hierarchy(child) for child in child_cats]
+        categories = Category.search_read(
+            [('id', 'child_of', roots.ids)], fields=['id', 'name', 'parent_id'], order='name', load=None
+        )
 
-            # Prune to desired fields
-            return {
-                'id': cat['id'],
-                'name': cat['name'],
-                'parent_id': cat['parent_id'],
-                'children': cat['children']
-            }
+        # One output node per category, then link every node under its parent.
+        # categories is name-ordered, so children keep that order.
+        nodes = {cat['id']: {
+            'id': cat['id'],
+            'name': cat['name'],
+            'parent_id': False,
+            'children': [],
+        } for cat in categories}
+        if parent_id:
+            parent_ref = [parent_id, Category.browse(parent_id).name]
+            for root_id in roots.ids:
+                nodes[root_id]['parent_id'] = parent_ref
+        for cat in categories:
+            parent_node = nodes.get(cat['parent_id'])
+            if parent_node:
+                node = nodes[cat['id']]
+                node['parent_id'] = [parent_node['id'], parent_node['name']]
+                parent_node['children'].append(node)
+
+        hierarchy = [nodes[root_id] for root_id in roots.ids]
 
-        # Build hierarchy for roots
-        hierarchy = [build_hierarchy(cat) for cat in root_categories]
         return request.make_json_response(hierarchy, status=200)
 
     @http.route(
@@ -366,41 +164,56 @@ class ProductAPI(http.Controller):
         selected_attributes = payload.get('selected_attributes', {})  # e.g. {"1": 5, "2": 8}
         selected_ptav_ids = []
 
+        # All template attribute values in one read:
+        # {(attribute_id, product_attribute_value_id): ptav_id}
+        # Templates without attributes (most products) skip the read entirely
+        ptav_map = {}
+        if selected_attributes and template.attribute_line_ids:
+            ptav_map = {
+                (r['attribute_id'], r['product_attribute_value_id']): r['id']
+                for r in template.product_template_attribute_value_ids.read(
+                    ['attribute_id', 'product_attribute_value_id'], load=None
+                )
+            }
+
         for attr_str, val_str in selected_attributes.items():
             try:
-                attr_id = int(attr_str)
-                val_id = int(val_str)
-                ptav = template.product_template_attribute_value_ids.filtered(
-                    lambda x: x.attribute_id.id == attr_id and x.product_attribute_value_id.id == val_id
-                )
-                if ptav:
-                    selected_ptav_ids.append(ptav.id)
+                ptav_id = ptav_map.get((int(attr_str), int(val_str)))
+                if ptav_id:
+                    selected_ptav_ids.append(ptav_id)
             except:
                 pass
 
-        # Attributes
+        # Attributes: lines, their attributes and their values in three batched reads
+        lines = template.attribute_line_ids
+        line_rows = lines.read(['attribute_id', 'product_template_value_ids', 'default_value_id'], load=None)
+        attribute_info = {
+            a['id']: a
+            for a in lines.attribute_id.read(['name', 'display_type'])
+        }
+        # product_template_value_ids already holds the template attribute values
+        value_info = {
+            v['id']: v
+            for v in lines.product_template_value_ids.read(['name', 'price_extra', 'is_custom', 'html_color'])
+        }
         attributes = []
-        for line in template.attribute_line_ids:
-            values = []
-            for value in line.product_template_value_ids:
-                ptav = template.product_template_attribute_value_ids.filtered(
-                    lambda x: x.attribute_id == line.attribute_id and x.product_attribute_value_id == value
-                )
-                price_extra = ptav.price_extra if ptav else 0.0
-                values.append({
-                    'id': value.id,
-                    'name': value.name,
-                    'price_extra': price_extra,
-                    'is_custom': value.is_custom,
-                    'html_color': value.html_color or False,
-                })
-
+        for line in line_rows:
+            attribute = attribute_info[line['attribute_id']]
             attributes.append({
-                'attribute_id': line.attribute_id.id,
-                'attribute_name': line.attribute_id.name,
-                'display_type': line.attribute_id.display_type,
-                'values': values,
-                'default_value_id': line.default_value_id.id if line.default_value_id else False,
+                'attribute_id': attribute['id'],
+                'attribute_name': attribute['name'],
+                'display_type': attribute['display_type'],
+                'values': [
+                    {
+                        'id': value_id,
+                        'name': value_info[value_id]['name'],
+                        'price_extra': value_info[value_id]['price_extra'],
+                        'is_custom': value_info[value_id]['is_custom'],
+                        'html_color': value_info[value_id]['html_color'] or False,
+                    }
+                    for value_id in line['product_template_value_ids']
+                ],
+                'default_value_id': line['default_value_id'] or False,
             })
 
         # Variant
@@ -411,21 +224,24 @@ class ProductAPI(http.Controller):
         base_url = request.httprequest.host_url.rstrip('/')
 
         if selected_ptav_ids:
-            variant = request.env['product.product'].sudo().search([
-                ('product_tmpl_id', '=', template.id),
-                ('product_template_attribute_value_ids', 'in', selected_ptav_ids),
-            ], limit=1)
+            # Resolved through product.template's ormcached combination lookup;
+            # the variant must carry every selected value, not just one of them
+            combination = request.env['product.template.attribute.value'].sudo().browse(selected_ptav_ids)
+            variant = template._get_variant_for_combination(combination)
             if variant:
                 current_price = variant.lst_price
                 sku = variant.default_code or sku
-                if variant.image_1920:
+                # bin_size: only presence matters, so fetch the size, not the blob
+                if variant.with_context(bin_size=True).image_1920:
                     image_url = f"{base_url}/web/image/product.product/{variant.id}/image_1920"
 
         if not image_url:
-            if template.image_1920:
+            template_sized = template.with_context(bin_size=True)
+            if template_sized.image_1920:
                 image_url = f"{base_url}/web/image/product.template/{template.id}/image_1920"
-            elif template.product_variant_ids and template.product_variant_ids[0].image_1920:
-                v = template.product_variant_ids[0]
+            elif template.product_variant_count > 1 and template_sized.product_variant_id.image_1920:
+                # A lone variant shows the template image, already tested above
+                v = template_sized.product_variant_id
                 image_url = f"{base_url}/web/image/product.product/{v.id}/image_1920"
 
         in_stock = variant.virtual_available > 0 if variant else template.virtual_available > 0
@@ -448,7 +264,7 @@ class ProductAPI(http.Controller):
             'volume': template.volume,
         }
 
-        return request.make_response(json.dumps(data, default=str), headers={'Content-Type': 'application/json'})
+        return request.make_response(json.dumps(data, separators=(',', ':')), headers={'Content-Type': 'application/json'})
 
     @http.route(
         '/api/v1/products/assign',
@@ -493,15 +309,12 @@ class ProductAPI(http.Controller):
         """
         # 1. Parse JSON body safely
         try:
-            body = request.jsonrequest
-        except Exception:
-            try:
-                body = json.loads(request.httprequest.data.decode('utf-8'))
-            except json.JSONDecodeError:
-                return request.make_json_response(
-                    {'error': 'Invalid or missing JSON body. Please send valid JSON.'},
-                    status=400
-                )
+            body = request.get_json_data()
+        except json.JSONDecodeError:
+            return request.make_json_response(
+                {'error': 'Invalid or missing JSON body. Please send valid JSON.'},
+                status=400
+            )
 
         # 2. Extract and validate required fields
         product_ids = body.get('product_ids', [])
@@ -543,7 +356,7 @@ class ProductAPI(http.Controller):
         # 4. Prepare many2many command
         if replace:
             # Replace: clear old → set new ones
-            command = Command.set(categories.ids)
+            command = [Command.set(categories.ids)]
         else:
             # Append: only link new ones
             command = [Command.link(cid) for cid in categories.ids]
@@ -568,372 +381,12 @@ class ProductAPI(http.Controller):
                 status=500
             )
 
-    @http.route(
-        '/api/v1/products/by_subcategory',
-        type='http',
-        auth='public',
-        methods=['POST'],
-        csrf=False,
-        cors='*'
-    )
-    def get_products_by_parent_and_subcategory(self, **kwargs):
-        """
-        Fetch published products under a specific parent category + subcategory (hierarchical).
-
-        POST /api/v1/products/by_subcategory
-        Content-Type: application/json
-
-        Request body example:
-        {
-            "parent_id": 10,
-            "subcategory_id": 25
-        }
-
-        Response (200 OK):
-        {
-            "success": true,
-            "parent_category": {"id": 10, "name": "Electronics"},
-            "subcategory": {"id": 25, "name": "Smartphones"},
-            "total_products": 12,
-            "products": [
-                {
-                    "id": 42,
-                    "name": "iPhone 14 Pro",
-                    "list_price": 999.0,
-                    "sale_price": 999.0,          // after pricelist if applied
-                    "currency": "USD",
-                    "description": "...",
-                    "image_url": "/web/image/product.template/42/image_1920",
-                    "slug": "iphone-14-pro",
-                    "stock_quantity": 15,
-                    "in_stock": true
-                },
-                ...
-            ]
-        }
-
-        Errors:
-        - 400 Bad Request (missing/invalid input)
-        - 404 Not Found (category not exist or mismatch)
-        - 500 Server Error
-        """
-        try:
-            # Parse JSON body (preferred in Odoo 18+)
-            try:
-                data = request.jsonrequest
-            except Exception:
-                try:
-                    data = request.httprequest.get_json(force=True)
-                except:
-                    return request.make_json_response(
-                        {'error': 'Invalid or missing JSON body. Send valid JSON.'},
-                        status=400
-                    )
-
-            parent_id = data.get('parent_id')
-            subcategory_id = data.get('subcategory_id')
-
-            if not parent_id or not subcategory_id:
-                return request.make_json_response(
-                    {'error': 'Both parent_id and subcategory_id are required (integer values).'},
-                    status=400
-                )
-
-            # Ensure they are integers
-            try:
-                parent_id = int(parent_id)
-                subcategory_id = int(subcategory_id)
-            except (ValueError, TypeError):
-                return request.make_json_response(
-                    {'error': 'parent_id and subcategory_id must be valid integers.'},
-                    status=400
-                )
-
-            Category = request.env['product.public.category'].sudo()
-            Product = request.env['product.template'].sudo()
-
-            parent = Category.browse(parent_id)
-            subcategory = Category.browse(subcategory_id)
-
-            if not parent.exists():
-                return request.make_json_response(
-                    {'error': f'Parent category ID {parent_id} not found.'},
-                    status=404
-                )
-
-            if not subcategory.exists():
-                return request.make_json_response(
-                    {'error': f'Subcategory ID {subcategory_id} not found.'},
-                    status=404
-                )
-
-            # Verify subcategory belongs to parent (or is descendant)
-            if subcategory.parent_id.id != parent.id:
-                # Optional: allow deeper nesting? If yes → use child_of on parent instead
-                return request.make_json_response(
-                    {'error': f'Subcategory "{subcategory.name}" does not belong to parent "{parent.name}".'},
-                    status=400
-                )
-
-            # Domain: products in this subcategory or its children + published + saleable
-            domain = [
-                ('public_categ_ids', 'child_of', subcategory.id),
-                ('sale_ok', '=', True),
-                ('website_published', '=', True),
-            ]
-
-            # Optional: filter by current website if multi-website
-            if request.website:
-                domain.append(('website_id', 'in', [False, request.website.id]))
-
-            products = Product.search(domain)
-
-            # Optional: apply pricelist (website context)
-            pricelist = request.website.get_current_pricelist() if request.website else None
-
-            result = []
-            for p in products:
-                price = p.list_price
-                if pricelist:
-                    price = pricelist._get_product_price(p, quantity=1)
-
-                image_url = False
-                if p.image_1920:
-                    image_url = f"/web/image/product.template/{p.id}/image_1920"
-                # Fallback to first image if needed
-                elif p.product_image_ids:
-                    image_url = f"/web/image/product.image/{p.product_image_ids[0].id}/image_1920"
-
-                result.append({
-                    'id': p.id,
-                    'name': p.name,
-                    'list_price': p.list_price,
-                    'sale_price': price if not float_is_zero(price - p.list_price,
-                                                             precision_digits=2) else p.list_price,
-                    'currency': p.currency_id.name or 'USD',
-                    'description': p.website_description or p.description_sale or '',
-                    'image_url': image_url,
-                    'slug': p.website_slug if hasattr(p, 'website_slug') else False,
-                    'stock_quantity': p.virtual_available,  # better than qty_available for most cases
-                    'in_stock': p.virtual_available > 0,
-                })
-
-            return request.make_json_response({
-                'success': True,
-                'parent_category': {'id': parent.id, 'name': parent.name},
-                'subcategory': {'id': subcategory.id, 'name': subcategory.name},
-                'total_products': len(result),
-                'products': result,
-            }, status=200)
-
-        except Exception as e:
-            _logger.exception("Error in /api/v1/products/by_subcategory: %s", str(e))
-            return request.make_json_response(
-                {'error': 'Internal server error occurred.'},
-                status=500
-            )
-
-    @http.route('/api/v1/products', type='http', auth='public', methods=['GET'], csrf=False, cors="*")
-    def list_products(self, **kwargs):
-        try:
-            # Parse query parameters
-            page = int(kwargs.get('page', 1))
-            limit = int(kwargs.get('limit', 20))
-            category_id = kwargs.get('category_id')
-            search = kwargs.get('search')
-            sort = kwargs.get('sort')
-
-            # Build domain for published products
-            domain = [('website_published', '=', True)]
-            if category_id:
-                domain.append(('public_categ_ids', 'in', [int(category_id)]))
-            if search:
-                domain.append(('name', 'ilike', search))
-
-            # Determine sort order
-            sort_order = 'id'
-            if sort == 'price_asc':
-                sort_order = 'list_price asc'
-            elif sort == 'price_desc':
-                sort_order = 'list_price desc'
-            elif sort == 'name_desc':
-                sort_order = 'name desc'
-
-            # Search products
-            products = request.env['product.template'].sudo().search(
-                domain, offset=(page - 1) * limit, limit=limit, order=sort_order
-            )
-
-            # Get current website's pricelist for proper pricing
-            website = request.env['website'].get_current_website()
-            pricelist = website.pricelist_id
-
-            # Prepare response data
-            product_list = []
-            for product in products:
-                # Get price using pricelist rules
-                price, rule = pricelist._get_product_price_rule(
-                    product,
-                    quantity=qty or 1.0,
-                    partner=partner,
-                    date=False,  # or datetime if needed
-                    uom_id=False  # or the uom
-                )
-                product_list.append({
-                    'id': product.id,
-                    'name': product.name,
-                    'price': price,
-                    'description': product.description or '',
-                    'image_url': self._get_image_url(product),
-                    'stock': product.qty_available if hasattr(product, 'qty_available') else 0,
-                })
-
-            total_count = request.env['product.template'].sudo().search_count(domain)
-            total_pages = math.ceil(total_count / limit) if limit else 1
-
-            response = {
-                "products": product_list,
-                "total": total_count,
-                "pages": total_pages
-            }
-
-            return Response(json.dumps(response), status=200, content_type='application/json')
-
-        except Exception as e:
-            error = {'error': str(e)}
-            return Response(json.dumps(error), status=500, content_type='application/json')
-
-    def _get_product_price(self, product, pricelist):
-        """Get product price considering pricelist rules"""
-        # Use the product's list_price as fallback
-        price = product.list_price
-
-        try:
-            # Try to get price from pricelist
-            price = pricelist.get_product_price(product, 1, False)
-        except Exception:
-            # If that fails, try a different approach
-            try:
-                product_context = dict(request.env.context)
-                product_context.update({
-                    'pricelist': pricelist.id,
-                    'quantity': 1
-                })
-                product = product.with_context(product_context)
-                price = product.price
-            except Exception:
-                # Fall back to list_price if all else fails
-                pass
-
-        return price
-
-    def _get_image_url(self, product):
-        if product.image_1920:
-            base_url = request.httprequest.host_url.strip('/')
-            return f"{base_url}/web/image/product.template/{product.id}/image_1920/"
-        return ''
-
     @http.route('/api/v2/products', type='http', auth='public', methods=['GET'], csrf=False, cors="*")
     def list_products(self, **kwargs):
         try:
             # Parse query parameters
-            page = int(kwargs.get('page', 1))
-            limit = int(kwargs.get('limit', 20))
-            category_id = kwargs.get('category_id')
-            search = kwargs.get('search')
-            sort = kwargs.get('sort')
-
-            # Build domain for published products
-            domain = [('website_published', '=', True)]
-            if category_id:
-                domain.append(('public_categ_ids', 'in', [int(category_id)]))
-            if search:
-                domain.append(('name', 'ilike', search))
-
-            # Determine sort order
-            sort_order = 'id'
-            if sort == 'price_asc':
-                sort_order = 'list_price asc'
-            elif sort == 'price_desc':
-                sort_order = 'list_price desc'
-            elif sort == 'name_desc':
-                sort_order = 'name desc'
-
-            # Search products
-            products = request.env['product.template'].sudo().search(
-                domain, offset=(page - 1) * limit, limit=limit, order=sort_order
-            )
-
-            # Get current website's pricelist for proper pricing
-            website = request.env['website'].get_current_website()
-            pricelist = website.pricelist_id
-
-            # Prepare response data
-            product_list = []
-            for product in products:
-                # Get price using pricelist rules
-                price = self._get_product_price(product, pricelist)
-
-                product_list.append({
-                    'id': product.id,
-                    'name': product.name,
-                    'price': price,
-                    'description': product.description or '',
-                    'image_url': self._get_image_url(product),
-                    'stock': product.qty_available if hasattr(product, 'qty_available') else 0,
-                })
-
-            total_count = request.env['product.template'].sudo().search_count(domain)
-            total_pages = math.ceil(total_count / limit) if limit else 1
-
-            response = {
-                "products": product_list,
-                "total": total_count,
-                "pages": total_pages
-            }
-
-            return Response(json.dumps(response), status=200, content_type='application/json')
-
-        except Exception as e:
-            error = {'error': str(e)}
-            return Response(json.dumps(error), status=500, content_type='application/json')
-
-    def _get_product_price(self, product, pricelist):
-        """Get product price considering pricelist rules"""
-        # Use the product's list_price as fallback
-        price = product.list_price
-
-        try:
-            # Try to get price from pricelist
-            price = pricelist.get_product_price(product, 1, False)
-        except Exception:
-            # If that fails, try a different approach
-            try:
-                product_context = dict(request.env.context)
-                product_context.update({
-                    'pricelist': pricelist.id,
-                    'quantity': 1
-                })
-                product = product.with_context(product_context)
-                price = product.price
-            except Exception:
-                # Fall back to list_price if all else fails
-                pass
-
-        return price
-
-    def _get_image_url(self, product):
-        if product.image_1920:
-            base_url = request.httprequest.host_url.strip('/')
-            return f"{base_url}/web/image/product.template/{product.id}/image_1920/"
-        return ''
-
-    @http.route('/api/v1/products', type='http', auth='public', methods=['GET'], csrf=False, cors="*")
-    def list_products(self, **kwargs):
-        try:
-            # Parse query parameters
-            page = int(kwargs.get('page', 1))
-            limit = int(kwargs.get('limit', 20))
+            page = max(1, int(kwargs.get('page', 1)))
+            limit = min(100, max(1, int(kwargs.get('limit', 20))))
             category_id = kwargs.get('category_id')
             search = kwargs.get('search')
             sort = kwargs.get('sort')
@@ -954,132 +407,85 @@ class ProductAPI(http.Controller):
             elif sort == 'name_desc':
                 sort_order = 'name desc'
 
-            # Search products
-            products = request.env['product.template'].sudo().search(
-                domain, offset=(page - 1) * limit, limit=limit, order=sort_order
-            )
+            # Search products: page ids and the domain total in one query
+            offset = (page - 1) * limit
+            ProductTemplate = request.env['product.template'].sudo()
+            query = ProductTemplate._search(domain, offset=offset, limit=limit, order=sort_order)
+            request.env.cr.execute(query.select(
+                SQL.identifier(query.table, 'id'), SQL("COUNT(*) OVER ()"),
+            ))
+            id_rows = request.env.cr.fetchall()
+            products = ProductTemplate.browse([row[0] for row in id_rows])
 
             # Get current website's pricelist for proper pricing
-            website = request.env['website'].get_current_website()
+            # The http layer already resolved the website for this request
+            website = getattr(request, 'website', None) or request.env['website'].get_current_website()
             pricelist = website.pricelist_id
 
-            # Prepare response data
-            product_list = []
-            for product in products:
-                # Get price using pricelist rules
-                price, rule = pricelist._get_product_price_rule(
-                    product,
-                    quantity=qty or 1.0,
-                    partner=partner,
-                    date=False,  # or datetime if needed
-                    uom_id=False  # or the uom
+            # One batched read for the page; bin_size returns the image size
+            # instead of the blob, since only its presence is needed
+            rows = {
+                row['id']: row
+                for row in products.with_context(bin_size=True).read(
+                    ['name', 'description', 'image_1920']
                 )
-                product_list.append({
-                    'id': product.id,
-                    'name': product.name,
-                    'price': price,
-                    'description': product.description or '',
-                    'image_url': self._get_image_url(product),
-                    'stock': product.qty_available if hasattr(product, 'qty_available') else 0,
-                })
-
-            total_count = request.env['product.template'].sudo().search_count(domain)
-            total_pages = math.ceil(total_count / limit) if limit else 1
-
-            response = {
-                "products": product_list,
-                "total": total_count,
-                "pages": total_pages
             }
+            image_prefix = request.httprequest.host_url.strip('/') + '/web/image/product.template/'
 
-            return Response(json.dumps(response), status=200, content_type='application/json')
-
-        except Exception as e:
-            error = {'error': str(e)}
-            return Response(json.dumps(error), status=500, content_type='application/json')
-
-    def _get_product_price(self, product, pricelist):
-        """Get product price considering pricelist rules"""
-        # Use the product's list_price as fallback
-        price = product.list_price
-
-        try:
-            # Try to get price from pricelist
-            price = pricelist.get_product_price(product, 1, False)
-        except Exception:
-            # If that fails, try a different approach
+            # On-hand stock summed in SQL from stock.quant rather than through the
+            # qty_available compute: {template_id: quantity in internal locations}
+            stock_by_tmpl = defaultdict(float)
             try:
-                product_context = dict(request.env.context)
-                product_context.update({
-                    'pricelist': pricelist.id,
-                    'quantity': 1
-                })
-                product = product.with_context(product_context)
-                price = product.price
-            except Exception:
-                # Fall back to list_price if all else fails
-                pass
-
-        return price
-
-    def _get_image_url(self, product):
-        if product.image_1920:
-            base_url = request.httprequest.host_url.strip('/')
-            return f"{base_url}/web/image/product.template/{product.id}/image_1920/"
-        return ''
-
-    @http.route('/api/v2/products', type='http', auth='public', methods=['GET'], csrf=False, cors="*")
-    def list_products(self, **kwargs):
-        try:
-            # Parse query parameters
-            page = int(kwargs.get('page', 1))
-            limit = int(kwargs.get('limit', 20))
-            category_id = kwargs.get('category_id')
-            search = kwargs.get('search')
-            sort = kwargs.get('sort')
-
-            # Build domain for published products
-            domain = [('website_published', '=', True)]
-            if category_id:
-                domain.append(('public_categ_ids', 'in', [int(category_id)]))
-            if search:
-                domain.append(('name', 'ilike', search))
-
-            # Determine sort order
-            sort_order = 'id'
-            if sort == 'price_asc':
-                sort_order = 'list_price asc'
-            elif sort == 'price_desc':
-                sort_order = 'list_price desc'
-            elif sort == 'name_desc':
-                sort_order = 'name desc'
-
-            # Search products
-            products = request.env['product.template'].sudo().search(
-                domain, offset=(page - 1) * limit, limit=limit, order=sort_order
-            )
-
-            # Get current website's pricelist for proper pricing
-            website = request.env['website'].get_current_website()
-            pricelist = website.pricelist_id
+                # {variant_id: template_id}
+                tmpl_of = {
+                    v['id']: v['product_tmpl_id']
+                    for v in products.product_variant_ids.read(['product_tmpl_id'], load=None)
+                }
+                quant_groups = request.env['stock.quant'].sudo().read_group(
+                    [
+                        ('product_id', 'in', list(tmpl_of)),
+                        ('location_id.usage', '=', 'internal'),
+                        ('company_id', 'in', request.env.companies.ids),
+                    ],
+                    ['quantity:sum'], ['product_id'],
+                )
+                for group in quant_groups:
+                    stock_by_tmpl[tmpl_of[group['product_id'][0]]] += group['quantity'] or 0.0
+            except Exception as e:
+                _logger.warning("Stock computation failed for templates %s: %s", products.ids, e)
+
+            # Pricelist prices for the whole page in one call: {template_id: price}
+            prices = {}
+            if pricelist:
+                try:
+                    prices = pricelist._get_products_price(products, 1.0)
+                except Exception:
+                    prices = {}
 
             # Prepare response data
             product_list = []
             for product in products:
-                # Get price using pricelist rules
-                price = self._get_product_price(product, pricelist)
+                row = rows[product.id]
+                # Get price using pricelist rules (per product only if the batch failed)
+                price = prices[product.id] if product.id in prices else self._get_product_price(product, pricelist)
 
                 product_list.append({
                     'id': product.id,
-                    'name': product.name,
+                    'name': row['name'],
                     'price': price,
-                    'description': product.description or '',
-                    'image_url': self._get_image_url(product),
-                    'stock': product.qty_available if hasattr(product, 'qty_available') else 0,
+                    'description': row['description'] or '',
+                    'image_url': image_prefix + str(product.id) + '/image_1920/' if row['image_1920'] else '',
+                    'stock': stock_by_tmpl[product.id],
                 })
 
-            total_count = request.env['product.template'].sudo().search_count(domain)
-            total_pages = math.ceil(total_count / limit) if limit else 1
+            if id_rows:
+                total_count = id_rows[0][1]
+            elif not offset:
+                total_count = 0
+            else:
+                # Past the last page: no row carries the window count
+                total_count = ProductTemplate.search_count(domain)
+            total_pages = -(-total_count // limit) if limit else 1
 
             response = {
                 "products": product_list,
@@ -1087,11 +493,10 @@ class ProductAPI(http.Controller):
                 "pages": total_pages
             }
 
-            return Response(json.dumps(response), status=200, content_type='application/json')
+            return request.make_json_response(response)
 
         except Exception as e:
-            error = {'error': str(e)}
-            return Response(json.dumps(error), status=500, content_type='application/json')
+            return request.make_json_response({'error': str(e)}, status=500)
 
     def _get_product_price(self, product, pricelist):
         """Get product price considering pricelist rules"""
@@ -1117,8 +522,9 @@ class ProductAPI(http.Controller):
 
         return price
 
-    def _get_image_url(self, product):
-        if product.image_1920:
-            base_url = request.httprequest.host_url.strip('/')
+    def _get_image_url(self, product, base_url=None):
+        # bin_size: only presence matters, so fetch the size, not the blob
+        if product.with_context(bin_size=True).image_1920:
+            base_url = base_url or request.httprequest.host_url.strip('/')
             return f"{base_url}/web/image/product.template/{product.id}/image_1920/"
         return ''
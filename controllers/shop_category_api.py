@@ -1,28 +1,56 @@
 from odoo import http
 from odoo.http import request
+from odoo.tools import SQL
 import json
 import re
 import unicodedata
 
+from .worker_cache import TTLCache, claim, release
+
+# Per-worker cache of serialized category pages
+_SHOP_CATEGORY_CACHE = TTLCache(ttl=60, size=1024)
+# Seconds a request waits for an identical page already being computed
+SHOP_CATEGORY_INFLIGHT_WAIT = 5
+
 
 # --- CUSTOM SLUG (Odoo 18 Community no longer provides slug()) ---
 def slug(record):
-    name = record.name or ""
-    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return slug_from(record.id, record.name)
+
+
+def slug_from(record_id, name):
+    """slug() for values already read, without going through a record."""
+    name = unicodedata.normalize('NFKD', name or "").encode('ascii', 'ignore').decode('ascii')
     name = re.sub(r'[^a-zA-Z0-9-]+', '-', name).strip('-').lower()
-    return f"{record.id}-{name}"
+    return f"{record_id}-{name}"
 
 
 class ShopCategoryAPI(http.Controller):
 
     @http.route('/api/shop/category', type='http', auth='public', methods=['GET'], csrf=False, cors="*")
     def get_shop_category(self, **params):
+        owner = False
         try:
             # Get params
             category_id = int(params.get('category_id', 0))
             limit = int(params.get('limit', 20))
             offset = int(params.get('offset', 0))
 
+            # Everything is read with sudo, so the body depends only on the
+            # database, the language and the paging parameters
+            cache_key = (request.env.cr.dbname, 'shop_category', request.env.lang, category_id, limit, offset)
+            body = _SHOP_CATEGORY_CACHE.get(cache_key)
+            if body is not None:
+                return http.Response(body, status=200, content_type='application/json')
+
+            # Identical pages requested together share one computation: the
+            # followers wait for the first one and serve the body it cached
+            owner = claim(cache_key, SHOP_CATEGORY_INFLIGHT_WAIT)
+            if not owner:
+                body = _SHOP_CATEGORY_CACHE.get(cache_key)
+                if body is not None:
+                    return http.Response(body, status=200, content_type='application/json')
+
             Category = request.env['product.public.category'].sudo()
             Product = request.env['product.template'].sudo()
 
@@ -35,31 +63,47 @@ class ShopCategoryAPI(http.Controller):
                 )
 
             # Subcategories
-            subcategories = Category.search([('parent_id', '=', parent_category.id)])
             subcategories_data = [
                 {
-                    'id': c.id,
-                    'name': c.name,
-                    'url': f"/shop/category/{slug(c)}",
+                    'id': c['id'],
+                    'name': c['name'],
+                    'url': f"/shop/category/{slug_from(c['id'], c['name'])}",
                 }
-                for c in subcategories
+                for c in Category.search_read([('parent_id', '=', parent_category.id)], ['name'])
             ]
 
-            # Products
-            domain = [('public_categ_ids', 'child_of', parent_category.id)]
-            total_products = Product.search_count(domain)
-            product_records = Product.search(domain, limit=limit, offset=offset)
+            # Products: the category subtree is resolved once (a parent_path prefix
+            # match) and shared by the count and the page search
+            descendant_ids = Category.search([('id', 'child_of', parent_category.id)]).ids
+            domain = [('public_categ_ids', 'in', descendant_ids)]
+            # Page ids and the domain total in one query
+            query = Product._search(domain, offset=offset, limit=limit)
+            request.env.cr.execute(query.select(
+                SQL.identifier(query.table, 'id'), SQL("COUNT(*) OVER ()"),
+            ))
+            id_rows = request.env.cr.fetchall()
+            if id_rows:
+                total_products = id_rows[0][1]
+            elif not offset:
+                total_products = 0
+            else:
+                # Past the last page: no row carries the window count
+                total_products = Product.search_count(domain)
+            # One read for exactly the columns serialized below
+            product_rows = Product.browse([row[0] for row in id_rows]).read(
+                ['name', 'list_price', 'currency_id']
+            )
 
             products_data = [
                 {
-                    'id': p.id,
-                    'name': p.name,
-                    'price': p.list_price,
-                    'currency': p.currency_id.name,
-                    'image_url': f"/web/image/product.template/{p.id}/image_1024",
-                    'url': f"/shop/product/{slug(p)}",
+                    'id': p['id'],
+                    'name': p['name'],
+                    'price': p['list_price'],
+                    'currency': p['currency_id'][1] if p['currency_id'] else False,
+                    'image_url': f"/web/image/product.template/{p['id']}/image_1024",
+                    'url': f"/shop/product/{slug_from(p['id'], p['name'])}",
                 }
-                for p in product_records
+                for p in product_rows
             ]
 
             response = {
@@ -80,8 +124,10 @@ class ShopCategoryAPI(http.Controller):
                 }
             }
 
+            body = json.dumps(response, separators=(',', ':')).encode()
+            _SHOP_CATEGORY_CACHE.set(cache_key, body)
             return http.Response(
-                json.dumps(response),
+                body,
                 status=200,
                 content_type='application/json'
             )
@@ -92,3 +138,6 @@ class ShopCategoryAPI(http.Controller):
                 status=500,
                 content_type='application/json'
             )
+        finally:
+            if owner:
+                release(cache_key)
@@ -6,6 +6,12 @@ import logging
 
 _logger = logging.getLogger(__name__)
 
+# Validation patterns, compiled once at import
+EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+NAME_REGEX = re.compile(r"^[a-zA-Z\s\-'\.]+$")
+REPEATED_CHAR_REGEX = re.compile(r'(.)\1{2,}')
+PASSWORD_SPECIALS = frozenset('!@#$%^&*()_+-=[]{}|;:,.<>?`~')
+
 
 class SuperAdminApiController(http.Controller):
     @http.route(['/api/v1/create_super_admin'], type='json', auth='public', csrf=False, methods=['POST'], cors='*')
@@ -88,25 +94,17 @@ class SuperAdminApiController(http.Controller):
         # ------------------------
         # 6. Validate country and state
         # ------------------------
-        country = request.env['res.country'].sudo().search([('name', 'ilike', country_name)], limit=1)
-        if not country:
+        # Looked up in ormcached name -> id maps of the (small) country and state tables
+        country_id = request.env['res.country']._get_country_id_by_name(country_name.lower())
+        if not country_id:
             return {'success': False, 'error': 'Invalid country name'}
 
-        state = request.env['res.country.state'].sudo().search(
-            [('name', 'ilike', state_name), ('country_id', '=', country.id)], limit=1
-        )
-        if not state:
+        state_id = request.env['res.country.state']._get_state_id_by_name(country_id, state_name.lower())
+        if not state_id:
             return {'success': False, 'error': 'Invalid state name or not in the specified country'}
 
         # ------------------------
-        # 7. Check if user already exists
-        # ------------------------
-        existing_user = request.env['res.users'].sudo().search([('login', '=', email)], limit=1)
-        if existing_user:
-            return {'success': False, 'error': 'Email already exists'}
-
-        # ------------------------
-        # 8. Create partner and super admin user safely
+        # 7. Create partner and super admin user safely
         # ------------------------
         try:
             Partner = request.env['res.partner'].sudo()
@@ -118,29 +116,37 @@ class SuperAdminApiController(http.Controller):
                 'email': email,
                 'street': street,
                 'city': city,
-                'state_id': state.id,
-                'country_id': country.id,
+                'state_id': state_id,
+                'country_id': country_id,
             }
             if phone:
                 partner_vals['phone'] = phone
 
-            partner = Partner.create(partner_vals)
-            request.env.cr.commit()  # commit to avoid transaction issues
-
             # User creation with admin & internal groups
             group_system = request.env.ref("base.group_system")
             group_internal = request.env.ref("base.group_user")
 
-            user_vals = {
-                'name': name,
-                'login': email,
-                'password': password,
-                'partner_id': partner.id,
-                'groups_id': [(6, 0, [group_system.id, group_internal.id])]
-            }
+            # The existence probe and both records share one savepoint: any
+            # failure in here rolls all of it back before the error response,
+            # so the request transaction commits nothing from a failed call
+            with request.env.cr.savepoint():
+                # Plain existence probe; also catches archived users, which the
+                # unique login constraint would reject at create time anyway
+                request.env.cr.execute("SELECT 1 FROM res_users WHERE login = %s LIMIT 1", (email,))
+                if request.env.cr.fetchone():
+                    return {'success': False, 'error': 'Email already exists'}
+
+                partner = Partner.create(partner_vals)
+
+                user_vals = {
+                    'name': name,
+                    'login': email,
+                    'password': password,
+                    'partner_id': partner.id,
+                    'groups_id': [(6, 0, [group_system.id, group_internal.id])]
+                }
 
-            user = User.with_context(no_reset_password=True).create(user_vals)
-            request.env.cr.commit()
+                user = User.with_context(no_reset_password=True).create(user_vals)
 
             return {
                 'success': True,
@@ -152,7 +158,6 @@ class SuperAdminApiController(http.Controller):
             }
 
         except Exception as e:
-            request.env.cr.rollback()
             _logger.error("Failed to create super admin for %s: %s", email, str(e), exc_info=True)
             return {'success': False, 'error': 'Internal server error'}
 
@@ -160,24 +165,36 @@ class SuperAdminApiController(http.Controller):
     # Helper Methods
     # ------------------------
     def _is_valid_email(self, email):
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email)) and len(email) <= 254
+        return len(email) <= 254 and bool(EMAIL_REGEX.match(email))
 
     def _validate_password_strength(self, password):
         errors = []
         if len(password) < 8:
             errors.append("Password must be at least 8 characters")
-        if not any(c.isupper() for c in password):
+        # Single pass over the string, collecting seen classes in a bitmask
+        flags = 0
+        for ch in password:
+            if ch.isupper():
+                flags |= 1
+            elif ch.islower():
+                flags |= 2
+            elif ch.isdigit():
+                flags |= 4
+            elif ch in PASSWORD_SPECIALS:
+                flags |= 8
+            if flags == 15:
+                break
+        if not flags & 1:
             errors.append("Password must contain an uppercase letter")
-        if not any(c.islower() for c in password):
+        if not flags & 2:
             errors.append("Password must contain a lowercase letter")
-        if not any(c.isdigit() for c in password):
+        if not flags & 4:
             errors.append("Password must contain a digit")
-        if not any(c in '!@#$%^&*()_+-=[]{}|;:,.<>?`~' for c in password):
+        if not flags & 8:
             errors.append("Password must contain a special character")
-        if re.search(r'(.)\1{2,}', password):
+        if REPEATED_CHAR_REGEX.search(password):
             errors.append("Avoid repeated characters")
         return errors
 
     def _is_valid_name(self, name):
-        return bool(re.match(r"^[a-zA-Z\s\-'\.]+$", name.strip())) if name else False
+        return bool(NAME_REGEX.match(name.strip())) if name else False
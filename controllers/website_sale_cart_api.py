@@ -56,11 +56,13 @@ class CartAPI(http.Controller):
                 set_qty=0  # 0 means add (don't replace existing quantity)
             )
 
-            # Refresh the order to get updated totals
-            sale_order = website.sale_get_order()
+            # No need to fetch the order again: _cart_update wrote through this
+            # record, so its amounts are recomputed when read below
 
-            # Calculate cart quantity
-            cart_quantity = sum(line.product_uom_qty for line in sale_order.order_line)
+            # Calculate cart quantity (summed in SQL, no line records loaded)
+            cart_quantity = request.env['sale.order.line'].sudo().read_group(
+                [('order_id', '=', sale_order.id)], ['product_uom_qty:sum'], []
+            )[0]['product_uom_qty'] or 0
 
             _logger.info(f"Product {product_id} added to cart {sale_order.id} for partner {request.env.user.partner_id.id if request.env.user.partner_id else 'guest'}")
 
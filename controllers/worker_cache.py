@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Per-worker caching helpers shared by the API controllers."""
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Per-worker {key: (expires_at, value)} store. Entries live ``ttl`` seconds;
+    once ``size`` keys are held the whole store is cleared, which bounds it
+    without tracking recency.
+    """
+
+    def __init__(self, ttl, size=1024):
+        self.ttl = ttl
+        self.size = size
+        self._entries = {}
+
+    def get(self, key):
+        """Return the live value stored under ``key``, or None."""
+        cached = self._entries.get(key)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        return None
+
+    def set(self, key, value):
+        if len(self._entries) >= self.size:
+            self._entries.clear()
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+
+# Keys being computed right now in this worker: {key: threading.Event}
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def claim(key, wait):
+    """
+    True when this request is the one computing ``key``; otherwise wait up to
+    ``wait`` seconds for the request already computing it and return False.
+    """
+    with _INFLIGHT_LOCK:
+        event = _INFLIGHT.get(key)
+        if event is None:
+            _INFLIGHT[key] = threading.Event()
+            return True
+    event.wait(wait)
+    return False
+
+
+def release(key):
+    """Mark ``key`` computed and wake the requests waiting on it."""
+    with _INFLIGHT_LOCK:
+        event = _INFLIGHT.pop(key, None)
+    if event is not None:
+        event.set()
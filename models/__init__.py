@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from . import lookup_cache
 from . import product
 from . import sale_order
+from . import res_country
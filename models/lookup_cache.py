@@ -0,0 +1,41 @@
+from odoo import models, api
+
+
+class LookupCacheMixin(models.AbstractModel):
+    """
+    Invalidation for ormcached lookups over small reference tables. Inheriting
+    models list the fields their cached lookups read in ``_lookup_cache_fields``;
+    the cache is cleared on create and unlink, and on write only when one of
+    those fields actually changes value.
+    """
+    _name = 'laterna.lookup.cache.mixin'
+    _description = 'Lookup Cache Invalidation'
+
+    _lookup_cache_fields = frozenset()
+
+    def _clear_lookup_cache(self):
+        # Only the 'default' ormcache group holds these lookups; the assets,
+        # templates, routing and groups caches are left alone
+        self.env.registry.clear_cache('default')
+
+    def _lookup_cache_values(self, fnames):
+        return self.sudo().read(fnames, load=None)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self._clear_lookup_cache()
+        return records
+
+    def write(self, vals):
+        watched = sorted(self._lookup_cache_fields.intersection(vals))
+        before = self._lookup_cache_values(watched) if watched else None
+        res = super().write(vals)
+        if watched and self._lookup_cache_values(watched) != before:
+            self._clear_lookup_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._clear_lookup_cache()
+        return res
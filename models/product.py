@@ -1,9 +1,22 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 
 
 class ProductTemplate(models.Model):
     _inherit = 'product.template'
 
+    # The listings search name OR description_sale with ilike; name already
+    # carries a trigram index in product, this gives the other side one too
+    description_sale = fields.Text(index='trigram')
+
+    def init(self):
+        super().init()
+        # Serves the public listings' default order (website_sequence DESC, id DESC)
+        # over published, saleable templates without a sort step
+        tools.create_index(
+            self.env.cr, 'product_template_listing_idx', self._table,
+            ['website_sequence DESC', 'id DESC'], where='is_published AND sale_ok',
+        )
+
     def _get_price_from_pricelist(self, pricelist):
         self.ensure_one()
         product = self.with_context(
@@ -11,4 +24,34 @@ class ProductTemplate(models.Model):
             pricelist=pricelist.id,
             uom=self.uom_id.id
         )
-        return product.price
\ No newline at end of file
+        return product.price
+
+class ProductPublicCategory(models.Model):
+    _inherit = 'product.public.category'
+
+    # Templates filed directly under the category, kept in a column so the
+    # category listings read it with their rows instead of counting per request
+    product_count = fields.Integer(compute='_compute_product_count', store=True)
+
+    @api.depends('product_tmpl_ids', 'product_tmpl_ids.active')
+    def _compute_product_count(self):
+        counts = dict(self.env['product.template'].sudo()._read_group(
+            [('public_categ_ids', 'in', self.ids)], ['public_categ_ids'], ['__count'],
+        ))
+        for category in self:
+            category.product_count = counts.get(category, 0)
+
+
+class ProductPricelist(models.Model):
+    _name = 'product.pricelist'
+    _inherit = ['product.pricelist', 'laterna.lookup.cache.mixin']
+
+    _lookup_cache_fields = frozenset({'active', 'company_id', 'sequence'})
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_default_pricelist_id(self, company_id):
+        """First active pricelist usable by ``company_id`` (or shared), or False."""
+        return self.sudo().search(
+            [('company_id', 'in', [company_id, False])], limit=1
+        ).id or False
@@ -0,0 +1,74 @@
+from odoo import models, api, tools
+
+
+class ResCountry(models.Model):
+    _name = 'res.country'
+    _inherit = ['res.country', 'laterna.lookup.cache.mixin']
+
+    _lookup_cache_fields = frozenset({'name', 'code'})
+
+    @api.model
+    @tools.ormcache('country_id', 'self.env.lang')
+    def _get_country_name(self, country_id):
+        return self.sudo().browse(country_id).name
+
+    @api.model
+    @tools.ormcache()
+    def _get_country_ids_by_code(self):
+        """Return {ISO code: id} for every country."""
+        return {c['code']: c['id'] for c in self.sudo().search_read([], ['code'])}
+
+    @api.model
+    @tools.ormcache('self.env.lang')
+    def _get_country_ids_by_name(self):
+        """Return {lower-cased name: id} for every country, in name order."""
+        return {c['name'].lower(): c['id'] for c in self.sudo().search_read([], ['name'])}
+
+    @api.model
+    def _get_country_id_by_code(self, code):
+        """Return the id of the country with ISO ``code`` (already upper-cased), or False."""
+        return self._get_country_ids_by_code().get(code, False)
+
+    @api.model
+    def _get_country_id_by_name(self, name):
+        """
+        Return the id of the country named ``name`` (already lower-cased): an exact
+        case-insensitive match first, else the first partial match, or False.
+        """
+        ids_by_name = self._get_country_ids_by_name()
+        return ids_by_name.get(name) or next(
+            (country_id for country_name, country_id in ids_by_name.items() if name in country_name),
+            False,
+        )
+
+
+class ResCountryState(models.Model):
+    _name = 'res.country.state'
+    _inherit = ['res.country.state', 'laterna.lookup.cache.mixin']
+
+    _lookup_cache_fields = frozenset({'name', 'country_id'})
+
+    @api.model
+    @tools.ormcache('state_id', 'self.env.lang')
+    def _get_state_name(self, state_id):
+        return self.sudo().browse(state_id).name
+
+    @api.model
+    @tools.ormcache('country_id', 'self.env.lang')
+    def _get_state_ids_by_name(self, country_id):
+        """Return {lower-cased name: id} for every state of ``country_id``."""
+        states = self.sudo().search_read([('country_id', '=', country_id)], ['name'])
+        return {s['name'].lower(): s['id'] for s in states}
+
+    @api.model
+    def _get_state_id_by_name(self, country_id, name):
+        """
+        Return the id of the state of ``country_id`` named ``name`` (already
+        lower-cased): an exact case-insensitive match first, else the first
+        partial match, or False.
+        """
+        ids_by_name = self._get_state_ids_by_name(country_id)
+        return ids_by_name.get(name) or next(
+            (state_id for state_name, state_id in ids_by_name.items() if name in state_name),
+            False,
+        )
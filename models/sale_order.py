@@ -1,9 +1,18 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 import time
 
 class SaleOrder(models.Model):
     _inherit = 'sale.order'
 
+    def init(self):
+        super().init()
+        # Draft carts are a small, hot slice of sale_order: the partner's cart
+        # lookups and counts stay on this index however large the table grows
+        tools.create_index(
+            self.env.cr, 'sale_order_cart_lookup_idx', self._table,
+            ['partner_id', 'website_id'], where="state = 'draft'",
+        )
+
     # ------------------------------
     # Create new cart
     # ------------------------------
@@ -26,17 +35,18 @@ class SaleOrder(models.Model):
         if not product.exists():
             raise ValueError("Product not found")
 
-        line = self.order_line.filtered(lambda l: l.product_id.id == product_id)
+        # Either way the order gets a single write, so its amounts and taxes
+        # are recomputed once
+        line = self.order_line.filtered(lambda l: l.product_id.id == product_id)[:1]
         if line:
-            line.product_uom_qty += quantity
+            command = (1, line.id, {'product_uom_qty': line.product_uom_qty + quantity})
         else:
-            self.write({
-                'order_line': [(0, 0, {
-                    'product_id': product.id,
-                    'product_uom_qty': quantity,
-                    'price_unit': product.lst_price,
-                })]
+            command = (0, 0, {
+                'product_id': product.id,
+                'product_uom_qty': quantity,
+                'price_unit': product.lst_price,
             })
+        self.write({'order_line': [command]})
         return True
 
     # ------------------------------